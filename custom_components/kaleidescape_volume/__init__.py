@@ -1,17 +1,29 @@
 import asyncio
 import logging
+import time
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant.const import CONF_HOST, CONF_PORT, EVENT_HOMEASSISTANT_STOP
+from homeassistant.components.media_player import DOMAIN as MEDIA_PLAYER_DOMAIN
 from homeassistant.core import HomeAssistant
 import homeassistant.helpers.config_validation as cv
+from homeassistant.helpers.storage import Store
 
 from .pykaleidescape_fork.kaleidescape import Device as KaleidescapeDevice, const
-from .volume_repeat import VolumeRepeatManager
+from .volume_repeat import (
+    REPEAT_POLICIES,
+    REPEAT_POLICY_SKIP,
+    RepeatProfile,
+    VolumeRepeatManager,
+)
+from .volume_pacing import STORAGE_VERSION, AdaptivePacer
+from .volume_target import VolumeTarget
+from .volume_feedback import FEEDBACK_MIN_INTERVAL, VolumeFeedback
+from .volume_events import VolumeEventEngine
 from .bridge import (
-    connect_device,
+    connect_device_with_retry,
     connect_dispatcher,
     disconnect_dispatcher,
     disconnect_device,
@@ -22,6 +34,31 @@ _LOGGER = logging.getLogger(__name__)
 DOMAIN = "kaleidescape_volume"
 CONF_REPEAT_INTERVAL = "repeat_interval"
 DEFAULT_REPEAT_INTERVAL = 0.25 # default seconds between repeated HA events
+CONF_REPEAT_POLICY = "repeat_policy"
+CONF_REPEAT_DELAY = "repeat_delay" # seconds from press to first repeat
+CONF_REPEAT_MIN_INTERVAL = "repeat_min_interval" # fastest interval while held
+CONF_REPEAT_RAMP_TIME = "repeat_ramp_time" # seconds to reach the fastest interval
+DEFAULT_REPEAT_RAMP_TIME = 2.0
+CONF_REPEAT_MAX_MULTIPLIER = "repeat_max_multiplier" # steps per repeat at full speed
+CONF_TARGET_MEDIA_PLAYER = "target_media_player" # call its volume services directly
+CONF_STEP = "step" # volume_set step instead of volume_up/volume_down
+CONF_FIRE_EVENTS = "fire_events" # also fire bus events; default only without a target
+CONF_COALESCE = "coalesce" # hold back steps while a volume call is outstanding
+CONF_ADAPTIVE_PACING = "adaptive_pacing" # learn the repeat interval from the target
+CONF_PACING_MIN_INTERVAL = "pacing_min_interval"
+DEFAULT_PACING_MIN_INTERVAL = 0.05
+CONF_PACING_MAX_INTERVAL = "pacing_max_interval"
+DEFAULT_PACING_MAX_INTERVAL = 1.0
+CONF_FEEDBACK_MEDIA_PLAYER = "feedback_media_player" # volume shown on the player's OSD
+CONF_FEEDBACK_MIN_INTERVAL = "feedback_min_interval"
+FEEDBACK_CAPABILITIES = (
+    const.VOLUME_CAPABILITIES_VOLUME_CONTROL
+    | const.VOLUME_CAPABILITIES_MUTE_CONTROL
+    | const.VOLUME_CAPABILITIES_SET_VOLUME
+    | const.VOLUME_CAPABILITIES_VOLUME_FEEDBACK
+    | const.VOLUME_CAPABILITIES_MUTE_FEEDBACK
+)
+EVENT_VOLUME_BUTTON = "kaleidescape_volume_button"
 
 CONFIG_SCHEMA = vol.Schema(
     {
@@ -36,6 +73,63 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Coerce(float),
                     vol.Range(min=0.05, max=2.0),
                 ),
+                vol.Optional(
+                    CONF_REPEAT_POLICY,
+                    default=REPEAT_POLICY_SKIP,
+                ): vol.In(REPEAT_POLICIES),
+                vol.Optional(CONF_REPEAT_DELAY): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0.05, max=2.0),
+                ),
+                vol.Optional(CONF_REPEAT_MIN_INTERVAL): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0.05, max=2.0),
+                ),
+                vol.Optional(
+                    CONF_REPEAT_RAMP_TIME,
+                    default=DEFAULT_REPEAT_RAMP_TIME,
+                ): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0.0, max=30.0),
+                ),
+                vol.Optional(CONF_REPEAT_MAX_MULTIPLIER, default=1): vol.All(
+                    vol.Coerce(int),
+                    vol.Range(min=1, max=10),
+                ),
+                vol.Optional(CONF_TARGET_MEDIA_PLAYER): cv.entity_domain(
+                    MEDIA_PLAYER_DOMAIN
+                ),
+                vol.Optional(CONF_STEP): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0.001, max=0.25),
+                ),
+                vol.Optional(CONF_FIRE_EVENTS): cv.boolean,
+                vol.Optional(CONF_COALESCE, default=False): cv.boolean,
+                vol.Optional(CONF_ADAPTIVE_PACING, default=False): cv.boolean,
+                vol.Optional(
+                    CONF_PACING_MIN_INTERVAL,
+                    default=DEFAULT_PACING_MIN_INTERVAL,
+                ): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0.05, max=2.0),
+                ),
+                vol.Optional(
+                    CONF_PACING_MAX_INTERVAL,
+                    default=DEFAULT_PACING_MAX_INTERVAL,
+                ): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0.05, max=2.0),
+                ),
+                vol.Optional(CONF_FEEDBACK_MEDIA_PLAYER): cv.entity_domain(
+                    MEDIA_PLAYER_DOMAIN
+                ),
+                vol.Optional(
+                    CONF_FEEDBACK_MIN_INTERVAL,
+                    default=FEEDBACK_MIN_INTERVAL,
+                ): vol.All(
+                    vol.Coerce(float),
+                    vol.Range(min=0.0, max=2.0),
+                ),
             }
         )
     },
@@ -45,6 +139,7 @@ CONFIG_SCHEMA = vol.Schema(
 
 async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     """Set up the Kaleidescape volume sidecar."""
+    setup_started = time.monotonic()
     conf = config.get(DOMAIN)
     if conf is None:
         _LOGGER.debug("No %s config found; not starting", DOMAIN)
@@ -53,63 +148,177 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
     host = conf[CONF_HOST]
     port = conf[CONF_PORT]
     repeat_interval = conf[CONF_REPEAT_INTERVAL]
+    repeat_policy = conf[CONF_REPEAT_POLICY]
+    repeat_profile = RepeatProfile(
+        interval=repeat_interval,
+        delay=conf.get(CONF_REPEAT_DELAY),
+        min_interval=conf.get(CONF_REPEAT_MIN_INTERVAL),
+        ramp_time=conf[CONF_REPEAT_RAMP_TIME],
+        max_multiplier=conf[CONF_REPEAT_MAX_MULTIPLIER],
+    )
+    target_entity = conf.get(CONF_TARGET_MEDIA_PLAYER)
+    pacer: AdaptivePacer | None = None
+    if conf[CONF_ADAPTIVE_PACING]:
+        if target_entity:
+            # Learned intervals of every target, so later sessions start tuned
+            pacing_store = Store(hass, STORAGE_VERSION, f"{DOMAIN}.pacing")
+            pacer = AdaptivePacer(
+                hass,
+                target_entity,
+                pacing_store,
+                await pacing_store.async_load() or {},
+                repeat_interval,
+                conf[CONF_PACING_MIN_INTERVAL],
+                conf[CONF_PACING_MAX_INTERVAL],
+            )
+            pacer.async_start()
+        else:
+            _LOGGER.warning(
+                "%s requires %s; repeating at a fixed interval",
+                CONF_ADAPTIVE_PACING,
+                CONF_TARGET_MEDIA_PLAYER,
+            )
+    target = (
+        VolumeTarget(
+            hass,
+            target_entity,
+            conf.get(CONF_STEP),
+            coalesce=conf[CONF_COALESCE],
+            pacer=pacer,
+        )
+        if target_entity
+        else None
+    )
+    fire_events = conf.get(CONF_FIRE_EVENTS, target is None)
 
     _LOGGER.info(
-        "Starting Kaleidescape volume bridge for %s:%s (repeat_interval=%.3f)",
+        "Starting Kaleidescape volume bridge for %s:%s "
+        "(repeat_profile=%s, repeat_policy=%s, target=%s, fire_events=%s)",
         host,
         port,
-        repeat_interval,
+        repeat_profile,
+        repeat_policy,
+        target_entity,
+        fire_events,
     )
     
     device = KaleidescapeDevice(host, port=port)
     connection: Any | None = None
-    repeat_mgr = VolumeRepeatManager(hass, repeat_interval)
+    state_connection: Any | None = None
+    repeat_mgr = VolumeRepeatManager(
+        hass,
+        repeat_profile,
+        event_type=EVENT_VOLUME_BUTTON,
+        policy=repeat_policy,
+        target=target,
+        fire_events=fire_events,
+        pacer=pacer,
+    )
+    feedback_entity = conf.get(CONF_FEEDBACK_MEDIA_PLAYER)
+    feedback = (
+        VolumeFeedback(
+            hass,
+            device,
+            feedback_entity,
+            FEEDBACK_CAPABILITIES,
+            conf[CONF_FEEDBACK_MIN_INTERVAL],
+        )
+        if feedback_entity
+        else None
+    )
+    engine = VolumeEventEngine(
+        hass,
+        repeat_mgr,
+        EVENT_VOLUME_BUTTON,
+        fire_events=fire_events,
+        target=target,
+        feedback=feedback,
+        entity_id=target_entity or feedback_entity,
+    )
+    diagnostics: dict[str, Any] = {
+        "setup_to_ready": None,
+        "connection_stats": device.connection.stats,
+        "repeat_stats": repeat_mgr.stats,
+        "target_stats": target.stats if target is not None else None,
+        "pacing_stats": pacer.stats if pacer is not None else None,
+        "feedback_stats": feedback.stats if feedback is not None else None,
+    }
+    hass.data[DOMAIN] = diagnostics
 
     
     def _handle_event(event: str, params: list[str] = None) -> None:
-        """Handle only the Kaleidescape volume button events."""
+        """Handle only the Kaleidescape volume button events.
+
+        With a target media player, its volume is changed directly; bus events
+        are only fired when enabled.
+        """
         if event != const.USER_DEFINED_EVENT:
             return
     
         name = params[0] # volume event name
-        _LOGGER.debug("Kaleidescape volume event: %s", name)
-    
-        hass.bus.async_fire(
-            "kaleidescape_volume_button",
-            {"event": name},
-        )
+        argument = "=".join(params[1:]) # e.g. the level of SET_VOLUME_LEVEL=n
+        _LOGGER.debug("Kaleidescape volume event: %s %s", name, argument)
+        engine.handle(name, argument, hass.loop.time())
 
-        # Start / stop repeating PRESS events
-        if name == "VOLUME_UP_PRESS":
-            repeat_mgr.start("VOLUME_UP_PRESS")
-        elif name == "VOLUME_UP_RELEASE":
-            repeat_mgr.stop("VOLUME_UP_PRESS")
-        elif name == "VOLUME_DOWN_PRESS":
-            repeat_mgr.start("VOLUME_DOWN_PRESS")
-        elif name == "VOLUME_DOWN_RELEASE":
-            repeat_mgr.stop("VOLUME_DOWN_PRESS")
 
+    def _handle_state(event: str, *args: Any) -> None:
+        """Report how long after setup volume events became available."""
+        if event != const.STATE_CONNECTED:
+            return
+
+        if feedback is not None:
+            # Bring the on-screen volume up to date after (re)connecting
+            feedback.async_resend()
+
+        if diagnostics["setup_to_ready"] is not None:
+            return
+
+        diagnostics["setup_to_ready"] = time.monotonic() - setup_started
+        _LOGGER.info(
+            "Kaleidescape volume events ready %.2fs after setup",
+            diagnostics["setup_to_ready"],
+        )
 
     async def _async_stop(event: Any) -> None:
         """Handle Home Assistant stop to shut down the device cleanly."""
         _LOGGER.info("Stopping Kaleidescape volume bridge for %s:%s", host, port)
-        nonlocal connection
+        nonlocal connection, state_connection
+
+        connect_task.cancel()
 
         # Stop any ongoing repeat tasks
         repeat_mgr.stop_all()
+        if pacer is not None:
+            pacer.async_stop()
+        if feedback is not None:
+            feedback.async_stop()
+        engine.async_stop()
 
         disconnect_dispatcher(connection)
         connection = None
+        disconnect_dispatcher(state_connection)
+        state_connection = None
         await disconnect_device(device)
 
     # Ensure we always clean up on shutdown
     hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
 
-    # Connect device + dispatcher, then enable volume events
-    if not await connect_device(device, host, port):
-        # Don't crash HA startup; just skip the bridge
-        return False
+    # Listen before connecting so button events flow as soon as the socket is up
+    connection = connect_dispatcher(
+        device, _handle_event, events={const.USER_DEFINED_EVENT}
+    )
+    state_connection = device.dispatcher.connect(
+        _handle_state, events={const.STATE_CONNECTED}
+    )
+
+    if feedback is not None:
+        feedback.async_start()
+    engine.async_start()
 
-    connection = connect_dispatcher(device, _handle_event)
+    # Connect in the background so a slow or offline player never delays startup
+    connect_task = hass.async_create_background_task(
+        connect_device_with_retry(device, host, port),
+        f"{DOMAIN} connect {host}:{port}",
+    )
 
     return True
@@ -1,25 +1,69 @@
 """Connection and dispatcher helpers for the Kaleidescape volume bridge."""
 
+import asyncio
 import logging
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Iterable, Optional
+
+from .pykaleidescape_fork.kaleidescape import const
+from .pykaleidescape_fork.kaleidescape.connection import reconnect_backoff
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def connect_device(device: Any, host: str, port: int) -> bool:
-    """Connect to the Kaleidescape device; return True on success."""
+    """Connect to the Kaleidescape device; return True on success.
+
+    A connect failing after the socket opened, e.g. while fetching the initial
+    state, is closed again so the next attempt starts over.
+    """
     try:
         await device.connect()
         _LOGGER.info("Connected to Kaleidescape at %s:%s", host, port)
         return True
     except Exception:  # noqa: BLE001
         _LOGGER.exception("Failed to connect to Kaleidescape device")
+        await disconnect_device(device)
         return False
 
 
-def connect_dispatcher(device: Any, callback: Callable[[Any], None]) -> Optional[Any]:
-    """Register a dispatcher listener and return the connection handle."""
-    dispatcher = getattr(device, "dispatcher", None)
+async def connect_device_with_retry(device: Any, host: str, port: int) -> None:
+    """Connect to the Kaleidescape device, retrying until connected or cancelled.
+
+    Retries follow the same backoff as the device's own reconnects: the first
+    is immediate, later ones wait a randomized, growing delay.
+    """
+    attempt = 0
+    while not await connect_device(device, host, port):
+        delay = (
+            reconnect_backoff(
+                attempt,
+                const.DEFAULT_RECONNECT_DELAY_MIN,
+                const.DEFAULT_RECONNECT_DELAY,
+            )
+            if attempt
+            else 0.0
+        )
+        attempt += 1
+        _LOGGER.info(
+            "Retrying connection to Kaleidescape at %s:%s in %.1fs", host, port, delay
+        )
+        await asyncio.sleep(delay)
+
+
+def connect_dispatcher(
+    device: Any,
+    callback: Callable[[Any], None],
+    events: Optional[Iterable[str]] = None,
+) -> Optional[Any]:
+    """Register a dispatcher listener and return the connection handle.
+
+    Prefers the device's user event dispatcher, which delivers button events
+    without waiting for full message parsing and state mirroring. With `events`,
+    the listener is only called for those event names.
+    """
+    dispatcher = getattr(device, "user_event_dispatcher", None) or getattr(
+        device, "dispatcher", None
+    )
     if dispatcher is None or not hasattr(dispatcher, "connect"):
         _LOGGER.warning(
             "Kaleidescape device has no 'dispatcher'; "
@@ -28,7 +72,10 @@ def connect_dispatcher(device: Any, callback: Callable[[Any], None]) -> Optional
         return None
 
     try:
-        connection = dispatcher.connect(callback)
+        if events is None:
+            connection = dispatcher.connect(callback)
+        else:
+            connection = dispatcher.connect(callback, events=events)
         _LOGGER.debug("Connected Kaleidescape dispatcher listener")
         return connection
     except Exception:  # noqa: BLE001
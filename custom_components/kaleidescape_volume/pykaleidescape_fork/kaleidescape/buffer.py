@@ -0,0 +1,176 @@
+"""Bounded buffer with overflow policies for queueing events."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Callable, Hashable
+from typing import Any, Generic, TypeVar
+
+from . import const
+
+T = TypeVar("T")
+
+OVERFLOW_POLICIES = (
+    const.OVERFLOW_BLOCK,
+    const.OVERFLOW_DROP_OLDEST,
+    const.OVERFLOW_COALESCE,
+)
+
+# Default hard limit under the block policy, as a multiple of maxsize
+BLOCK_LIMIT_FACTOR = 4
+
+
+def event_key(event: Any) -> str | None:
+    """Return key an event (response or device event) is coalesced by.
+
+    User defined events, and None, are never coalesced.
+    """
+    if event is None or event.name == const.USER_DEFINED_EVENT:
+        return None
+    return event.name
+
+
+class EventBuffer(Generic[T]):
+    """First in, first out buffer holding at most `maxsize` items, for one consumer.
+
+    When full, the overflow policy decides what happens to a new item:
+
+    - block: the item is kept and `put_nowait` returns False, asking the producer
+      to wait for `wait_for_space` before adding more. A producer that can't wait
+      is held to `limit` items (default `BLOCK_LIMIT_FACTOR` times maxsize):
+      past it, items coalesce as under the coalesce policy, except that items
+      with a key of None are kept rather than discarding one of them.
+    - drop_oldest: the oldest item is discarded.
+    - coalesce: an item queued under the same key is replaced in place. Items with
+      a key of None are never coalesced. Without a match the oldest is discarded.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        overflow: str = const.OVERFLOW_BLOCK,
+        key: Callable[[T], Hashable | None] | None = None,
+        limit: int | None = None,
+    ) -> None:
+        """Initializes buffer."""
+        if maxsize < 1:
+            raise ValueError("Buffer size must be at least 1")
+        if limit is not None and limit < maxsize:
+            raise ValueError("Buffer limit must be at least its size")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'")
+
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._key = key
+        self._limit = limit if limit is not None else maxsize * BLOCK_LIMIT_FACTOR
+        self._items: deque[list] = deque()
+        self._keyed: dict[Hashable, list] = {}
+        self._getter: asyncio.Future[None] | None = None
+        self._space: asyncio.Event = asyncio.Event()
+        self._space.set()
+
+        self.dropped = 0
+        self.coalesced = 0
+        self.depth_max = 0
+
+    @property
+    def maxsize(self) -> int:
+        """Return maximum number of items before overflow."""
+        return self._maxsize
+
+    @property
+    def overflow(self) -> str:
+        """Return overflow policy."""
+        return self._overflow
+
+    @property
+    def full(self) -> bool:
+        """Return if buffer holds maxsize items or more."""
+        return len(self._items) >= self._maxsize
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put_nowait(self, item: T) -> bool:
+        """Add item, returning False if the producer should wait for space."""
+        key = None
+        if self._key and self._overflow != const.OVERFLOW_DROP_OLDEST:
+            key = self._key(item)
+        blocking = self._overflow == const.OVERFLOW_BLOCK
+        over_limit = blocking and len(self._items) >= self._limit
+
+        if key is not None and (not blocking or over_limit):
+            entry = self._keyed.get(key)
+            if entry is not None:
+                entry[1] = item
+                self.coalesced += 1
+                return not blocking
+
+        if over_limit:
+            self._drop_oldest_keyed()
+        elif self.full and not blocking:
+            self._drop_oldest()
+
+        entry = [key, item]
+        self._items.append(entry)
+        if key is not None:
+            self._keyed[key] = entry
+        self.depth_max = max(self.depth_max, len(self._items))
+
+        if self._getter and not self._getter.done():
+            self._getter.set_result(None)
+
+        if self.full and self._overflow == const.OVERFLOW_BLOCK:
+            self._space.clear()
+            return False
+        return True
+
+    async def put(self, item: T) -> None:
+        """Add item, waiting for space first under the block policy."""
+        await self.wait_for_space()
+        self.put_nowait(item)
+
+    async def wait_for_space(self) -> None:
+        """Wait until the buffer is below maxsize, under the block policy."""
+        await self._space.wait()
+
+    def get_nowait(self) -> T:
+        """Remove and return the oldest item; raises IndexError when empty."""
+        key, item = entry = self._items.popleft()
+        if key is not None and self._keyed.get(key) is entry:
+            del self._keyed[key]
+        if not self.full:
+            self._space.set()
+        return item
+
+    async def get(self) -> T:
+        """Remove and return the oldest item, waiting for one if empty."""
+        while not self._items:
+            self._getter = asyncio.get_running_loop().create_future()
+            try:
+                await self._getter
+            finally:
+                self._getter = None
+        return self.get_nowait()
+
+    def clear(self) -> None:
+        """Discard all items."""
+        self._items.clear()
+        self._keyed.clear()
+        self._space.set()
+
+    def _drop_oldest(self) -> None:
+        self.get_nowait()
+        self.dropped += 1
+
+    def _drop_oldest_keyed(self) -> None:
+        """Discard the oldest item with a key, if any."""
+        for position, entry in enumerate(self._items):
+            if entry[0] is not None:
+                del self._items[position]
+                if self._keyed.get(entry[0]) is entry:
+                    del self._keyed[entry[0]]
+                self.dropped += 1
+                return
@@ -4,15 +4,20 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import random
 import socket
+import time
+from collections import deque
 from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
 from typing import TYPE_CHECKING
 
-import aiodns
-
 from . import const
-from .error import KaleidescapeError, MessageParseError, format_error
-from .message import Response
+from .buffer import EventBuffer, event_key
+from .error import KaleidescapeError, MessageError, MessageParseError, format_error
+from .message import GetDevicePowerState, Response, parse_user_defined_event
+from .protocol import LineProtocol
+from .resolver import Resolver
 
 if TYPE_CHECKING:
     from .dispatcher import Dispatcher
@@ -20,8 +25,138 @@ if TYPE_CHECKING:
 
 _LOGGER = logging.getLogger(__name__)
 
-SEPARATOR = "\n"
-SEPARATOR_BYTES = SEPARATOR.encode("latin-1")
+# Devices can only handle 10 concurrent requests, one per sequence number.
+MAX_PENDING_REQUESTS = 10
+
+# Seconds a sequence number abandoned mid-request is held back from reuse, so a
+# late reply is not delivered to the next request given that number. The number
+# is reused as soon as the late reply is complete; the window covers replies
+# that never arrive.
+TOMBSTONE_WINDOW = 5.0
+
+
+@dataclass
+class ConnectionStats:
+    """Counters describing the behavior of a connection."""
+
+    slot_queue_depth: int = 0
+    slot_queue_depth_max: int = 0
+    slot_waits: int = 0
+    slot_wait_time_total: float = 0.0
+    slot_wait_time_max: float = 0.0
+    requests_reclaimed: int = 0
+    late_responses_dropped: int = 0
+    event_queue_depth: int = 0
+    event_queue_depth_max: int = 0
+    events_dropped: int = 0
+    events_coalesced: int = 0
+    event_tasks_saved: int = 0
+    heartbeats_sent: int = 0
+    heartbeat_failures: int = 0
+    disconnects_detected: int = 0
+    last_time_to_detect: float | None = None
+    reconnect_attempts: int = 0
+    last_outage_duration: float | None = None
+
+
+@dataclass
+class LivenessOptions:
+    """Settings for detecting a dead connection.
+
+    The keepalive settings are applied to the socket where the platform supports
+    them. A heartbeat request is sent after `heartbeat_interval` seconds without
+    receiving anything, and must be answered within `heartbeat_timeout` seconds.
+    Set `heartbeat_interval` to None to disable heartbeats.
+    """
+
+    heartbeat_interval: float | None = const.DEFAULT_HEARTBEAT_INTERVAL
+    heartbeat_timeout: float = const.DEFAULT_HEARTBEAT_TIMEOUT
+    keepalive_idle: int = const.DEFAULT_KEEPALIVE_IDLE
+    keepalive_interval: int = const.DEFAULT_KEEPALIVE_INTERVAL
+    keepalive_count: int = const.DEFAULT_KEEPALIVE_COUNT
+    nodelay: bool = True
+
+
+class SequencePool:
+    """Fixed table of request sequence numbers handed out in FIFO order.
+
+    Free sequence numbers are kept on a free-list. When none are free, callers
+    queue up and a released number is handed directly to the oldest waiter.
+    """
+
+    def __init__(self, stats: ConnectionStats, size: int = MAX_PENDING_REQUESTS):
+        """Initializes pool."""
+        self._stats = stats
+        self._size = size
+        self._free: deque[int] = deque(range(size))
+        self._waiters: deque[asyncio.Future[int]] = deque()
+
+    @property
+    def available(self) -> int:
+        """Return number of free sequence numbers."""
+        return len(self._free)
+
+    async def acquire(self, timeout: float | None) -> int:
+        """Return a free sequence number, waiting up to timeout for one."""
+        if self._free and not self._waiters:
+            return self._free.popleft()
+
+        waiter: asyncio.Future[int] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._update_queue_depth()
+        start = time.monotonic()
+
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except BaseException as err:
+            if (
+                waiter.done()
+                and not waiter.cancelled()
+                and waiter.exception() is None
+            ):
+                # Slot was handed over as the wait timed out or was cancelled
+                self.release(waiter.result())
+            if isinstance(err, asyncio.TimeoutError):
+                raise ConnectionError("Timed out waiting for a free sequence") from err
+            raise
+        finally:
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._update_queue_depth()
+            waited = time.monotonic() - start
+            self._stats.slot_waits += 1
+            self._stats.slot_wait_time_total += waited
+            self._stats.slot_wait_time_max = max(
+                self._stats.slot_wait_time_max, waited
+            )
+
+    def release(self, seq: int) -> None:
+        """Return sequence number to the pool, handing it to the next waiter."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(seq)
+                self._update_queue_depth()
+                return
+        self._free.append(seq)
+
+    def reset(self) -> None:
+        """Free all sequence numbers and fail any waiters."""
+        self._free = deque(range(self._size))
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(ConnectionError("Connection reset"))
+        self._update_queue_depth()
+
+    def _update_queue_depth(self) -> None:
+        depth = len(self._waiters)
+        self._stats.slot_queue_depth = depth
+        self._stats.slot_queue_depth_max = max(
+            self._stats.slot_queue_depth_max, depth
+        )
 
 
 class Connection:
@@ -31,30 +166,82 @@ class Connection:
         self,
         dispatcher: Dispatcher,
         on_event: Callable[[Response], Coroutine[object, object, object]] | None = None,
+        buffered_protocol: bool = False,
+        on_user_event: Callable[[str], None] | None = None,
+        event_queue_size: int = const.DEFAULT_EVENT_QUEUE_SIZE,
+        event_overflow: str = const.OVERFLOW_BLOCK,
+        liveness: LivenessOptions | None = None,
+        lazy_responses: bool = False,
     ) -> None:
-        """Initializes connection."""
+        """Initializes connection.
+
+        With `buffered_protocol`, responses are read by a `LineProtocol` instead of
+        a stream reader task. `on_user_event` is called synchronously with the value
+        of each USER_DEFINED_EVENT, before the message is fully parsed.
+
+        Events are passed to `on_event` one at a time, in the order received, from
+        a queue of `event_queue_size` events. When the queue is full,
+        `event_overflow` either blocks reading from the device, drops the oldest
+        event, or coalesces events by message name. Reading is only blocked while no
+        request is waiting for a response, so under the block policy the queue may
+        grow past its size while requests are outstanding, up to a hard limit of
+        `BLOCK_LIMIT_FACTOR` times its size. Past that, events coalesce by name and
+        the oldest other events are dropped; user defined events are always kept.
+        Both are counted in the connection statistics.
+
+        `liveness` configures socket keepalive and idle heartbeats.
+
+        With `lazy_responses`, only the header of each line is parsed when received;
+        fields are decoded the first time they are read.
+        """
         self._dispatcher = dispatcher
         self._on_event: (
             Callable[[Response], Coroutine[object, object, object]] | None
         ) = on_event
 
+        self._host: str | None = None
         self._ip: str | None = None
         self._port: int | None = None
         self._timeout: float | None = None
         self._state: str = const.STATE_DISCONNECTED
         self._reader: asyncio.StreamReader | None = None
-        self._writer: asyncio.StreamWriter | None = None
+        self._writer: asyncio.StreamWriter | LineProtocol | None = None
+        self._buffered_protocol = buffered_protocol
+        self._on_user_event = on_user_event
+        self._lazy_responses = lazy_responses
+        self._events: EventBuffer[Response] = EventBuffer(
+            event_queue_size, event_overflow, key=event_key
+        )
+        self._event_handler_task: asyncio.Task | None = None
+        self._reading_paused = False
+        self._read_allowed = asyncio.Event()
+        self._read_allowed.set()
+        self._liveness = liveness if liveness is not None else LivenessOptions()
+        self._heartbeat_task: asyncio.Task | None = None
+        self._last_received: float = 0.0
         self._response_handler_task: asyncio.Task | None = None
         self._reconnect_delay: float | None = None
+        self._reconnect_delay_min: float = const.DEFAULT_RECONNECT_DELAY_MIN
+        self._race_addresses: bool = True
+        self._resolver = Resolver()
         self._reconnect_task: asyncio.Task | None = None
         self._reconnect_enabled: bool = False
+        self._outage_start: float = 0.0
         self._pending_requests: dict[int, Request] = {}
+        self._stats = ConnectionStats()
+        self._sequences = SequencePool(self._stats)
+        self._tombstones: dict[int, tuple[Request, asyncio.TimerHandle]] = {}
 
     @property
     def dispatcher(self) -> Dispatcher:
         """Return dispatcher instance."""
         return self._dispatcher
 
+    @property
+    def host(self) -> str | None:
+        """Return hostname or ip of the hardware device to connect to."""
+        return self._host
+
     @property
     def ip(self) -> str | None:
         """Return ip of the server connected to."""
@@ -75,21 +262,37 @@ class Connection:
         """Return state of the connection to the hardware device."""
         return self._state
 
+    @property
+    def stats(self) -> ConnectionStats:
+        """Return connection statistics."""
+        return self._stats
+
     async def connect(
         self,
-        ip: str,
+        host: str,
         port: int,
         timeout: float,
         reconnect: bool = False,
         reconnect_delay: float = const.DEFAULT_RECONNECT_DELAY,
+        reconnect_delay_min: float = const.DEFAULT_RECONNECT_DELAY_MIN,
+        race_addresses: bool = True,
     ) -> None:
-        """Connect to the hardware device."""
+        """Connect to the hardware device.
+
+        The host is resolved on connect, with answers cached and only looked up
+        again once expired or after a failed connect. With `race_addresses`,
+        connect attempts to every address of the host are raced.
+
+        Reconnects are retried immediately, then after an exponentially growing,
+        randomized delay between `reconnect_delay_min` and `reconnect_delay`.
+        """
         if self._state == const.STATE_CONNECTED:
             return
 
-        self._ip = ip
+        self._host = host
         self._port = port
         self._timeout = timeout
+        self._race_addresses = race_addresses
 
         # Disable auto_reconnect until a good connect
         self._reconnect_enabled = False
@@ -98,64 +301,274 @@ class Connection:
 
         self._reconnect_enabled = reconnect
         self._reconnect_delay = reconnect_delay
+        self._reconnect_delay_min = min(reconnect_delay_min, reconnect_delay)
 
         _LOGGER.info("Connected to %s", self._ip)
 
     async def _connect(self) -> None:
         """Connect to server."""
+        assert self._host is not None
+        addresses = await self._resolver.resolve(self._host)
+        if self._ip not in addresses:
+            self._ip = addresses[0]
+
         try:
-            connection = asyncio.open_connection(self._ip, self._port)
+            if self._race_addresses and len(addresses) > 1:
+                # Try the last good address first
+                others = [ip for ip in addresses if ip != self._ip]
+                connection = self._open_first([self._ip, *others])
+            else:
+                connection = self._open(self._ip)
             self._reader, self._writer = await asyncio.wait_for(
                 connection, self._timeout
             )
-        except ConnectionError:
-            # Don't allow subclasses of ConnectionError to be cast as OSErrors below
-            raise
         except (OSError, asyncio.TimeoutError) as err:
+            # Addresses may have changed, look them up again on the next attempt
+            self._resolver.invalidate(self._host)
+            if isinstance(err, ConnectionError):
+                # Don't allow subclasses of ConnectionError to be cast as OSErrors
+                raise
             # Generalize connection errors
             raise ConnectionError(format_error(err)) from err
 
-        self._response_handler_task = asyncio.create_task(self._response_handler())
+        self._configure_socket()
+        self._last_received = time.monotonic()
+
+        if self._reader:
+            self._response_handler_task = asyncio.create_task(
+                self._response_handler()
+            )
+        if self._on_event:
+            self._event_handler_task = asyncio.create_task(self._event_handler())
+        if self._liveness.heartbeat_interval:
+            self._heartbeat_task = asyncio.create_task(self._heartbeat())
 
         self._state = const.STATE_CONNECTED
         self._dispatcher.send(const.STATE_CONNECTED)
 
+    async def _open(
+        self, ip: str | None
+    ) -> tuple[asyncio.StreamReader | None, asyncio.StreamWriter | LineProtocol]:
+        """Open a connection to ip, returning its reader and writer."""
+        if self._buffered_protocol:
+            loop = asyncio.get_running_loop()
+            _, protocol = await loop.create_connection(
+                lambda: LineProtocol(self._handle_line, self._handle_lost),
+                ip,
+                self._port,
+            )
+            return None, protocol
+        return await asyncio.open_connection(ip, self._port)
+
+    async def _open_first(
+        self, ips: list[str | None]
+    ) -> tuple[asyncio.StreamReader | None, asyncio.StreamWriter | LineProtocol]:
+        """Race connection attempts to each ip, staggered, keeping the first that
+        succeeds."""
+        attempts: dict[asyncio.Task, str | None] = {}
+        pending: set[asyncio.Task] = set()
+        remaining = list(ips)
+        error: BaseException | None = None
+
+        def close_unused(task: asyncio.Task) -> None:
+            if not task.cancelled() and task.exception() is None:
+                task.result()[1].close()
+
+        try:
+            while remaining or pending:
+                if remaining:
+                    ip = remaining.pop(0)
+                    task = asyncio.create_task(self._open(ip))
+                    attempts[task] = ip
+                    pending.add(task)
+
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=const.CONNECT_RACE_DELAY if remaining else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    if task.exception() is None:
+                        for other in done - {task}:
+                            close_unused(other)
+                        self._ip = attempts[task]
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.add_done_callback(close_unused)
+                task.cancel()
+
+        assert error is not None
+        raise error
+
+    def _configure_socket(self) -> None:
+        """Apply keepalive and nodelay options to the connected socket."""
+        assert self._writer
+        sock = self._writer.get_extra_info("socket")
+        if sock is None:
+            return
+
+        liveness = self._liveness
+        options = [
+            (socket.SOL_SOCKET, "SO_KEEPALIVE", 1),
+            (socket.IPPROTO_TCP, "TCP_NODELAY", int(liveness.nodelay)),
+            # macOS names the idle option TCP_KEEPALIVE
+            (socket.IPPROTO_TCP, "TCP_KEEPIDLE", liveness.keepalive_idle),
+            (socket.IPPROTO_TCP, "TCP_KEEPALIVE", liveness.keepalive_idle),
+            (socket.IPPROTO_TCP, "TCP_KEEPINTVL", liveness.keepalive_interval),
+            (socket.IPPROTO_TCP, "TCP_KEEPCNT", liveness.keepalive_count),
+        ]
+        for level, name, value in options:
+            option = getattr(socket, name, None)
+            if option is None:
+                continue
+            try:
+                sock.setsockopt(level, option, value)
+            except OSError as err:
+                _LOGGER.debug("Failed to set socket option %s: %s", name, err)
+
+    async def _heartbeat(self) -> None:
+        """Send a request whenever the connection has been idle, to detect a dead
+        link."""
+        interval = self._liveness.heartbeat_interval
+        assert interval
+
+        while True:
+            idle = time.monotonic() - self._last_received
+            if idle < interval:
+                await asyncio.sleep(interval - idle)
+                continue
+
+            self._stats.heartbeats_sent += 1
+            try:
+                await asyncio.wait_for(
+                    GetDevicePowerState().send(self), self._liveness.heartbeat_timeout
+                )
+            except MessageError:
+                # Any reply shows the device is alive
+                pass
+            except (KaleidescapeError, asyncio.TimeoutError) as err:
+                self._stats.heartbeat_failures += 1
+                _LOGGER.warning("Heartbeat to %s failed", self._ip)
+                asyncio.create_task(
+                    self._handle_connection_error(
+                        ConnectionError(f"Heartbeat failed '{format_error(err)}'")
+                    )
+                )
+                return
+
     async def _response_handler(self) -> None:
         """Main loop receiving responses and events from hardware device."""
         assert self._reader
 
         while True:
             try:
+                await self._read_allowed.wait()
                 result = await self._reader.readuntil()
-
-                response = Response.factory(result.decode("latin-1").strip())
-                _LOGGER.debug("Response received '%s'", response.message)
-
-                if response.is_event:
-                    # Events are unsolicited notifications about a change in state.
-                    if self._on_event:
-                        asyncio.create_task(self._on_event(response))
-                elif response.device_id == const.LOCAL_CPDID:
-                    if response.seq not in self._pending_requests:
-                        _LOGGER.error("Response seq not registered '%s'", response)
-                    else:
-                        request = self._pending_requests[response.seq]
-                        request.set(response)
+                self._handle_line(result.decode("latin-1").strip())
             except (asyncio.IncompleteReadError, OSError) as err:
                 asyncio.create_task(self._handle_connection_error(err))
                 return
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.exception(
+                    "Unhandled exception %s('%s')", type(err).__name__, err
+                )
+
+    def _handle_line(self, line: str) -> None:
+        """Route a line received from hardware device to its request or handler."""
+        self._last_received = time.monotonic()
+        if self._on_user_event:
+            try:
+                value = parse_user_defined_event(line)
             except MessageParseError as err:
                 _LOGGER.exception(err)
+                return
+            if value is not None:
+                self._on_user_event(value)
+
+        try:
+            response = Response.factory(line, self._lazy_responses)
+        except MessageParseError as err:
+            _LOGGER.exception(err)
+            return
+
+        _LOGGER.debug("Response received '%s'", response.message)
+
+        if response.is_event:
+            # Events are unsolicited notifications about a change in state.
+            if self._on_event:
+                has_space = self._events.put_nowait(response)
+                self._update_event_stats()
+                if not has_space:
+                    self._pause_reading()
+        elif response.device_id == const.LOCAL_CPDID:
+            if response.seq in self._tombstones:
+                self._drop_late_response(response)
+            elif response.seq not in self._pending_requests:
+                _LOGGER.error("Response seq not registered '%s'", response)
+            else:
+                request = self._pending_requests[response.seq]
+                request.set(response)
+
+    def _update_event_stats(self) -> None:
+        """Copy event queue counters into the connection statistics."""
+        events = self._events
+        self._stats.event_queue_depth = len(events)
+        self._stats.event_queue_depth_max = events.depth_max
+        self._stats.events_dropped = events.dropped
+        self._stats.events_coalesced = events.coalesced
+
+    async def _event_handler(self) -> None:
+        """Pass queued events to the event handler one at a time, in order."""
+        assert self._on_event
+
+        while True:
+            response = await self._events.get()
+            self._update_event_stats()
+            if self._reading_paused and not self._events.full:
+                self._resume_reading()
+            self._stats.event_tasks_saved += 1
+            try:
+                await self._on_event(response)
+            except asyncio.CancelledError:
+                raise
             except Exception as err:  # pylint: disable=broad-except
                 _LOGGER.exception(
                     "Unhandled exception %s('%s')", type(err).__name__, err
                 )
 
+    def _pause_reading(self) -> None:
+        """Stop reading while the event queue is full."""
+        if self._reading_paused or self._pending_requests:
+            # Responses must keep flowing or the event handler may deadlock
+            return
+        self._reading_paused = True
+        self._read_allowed.clear()
+        if isinstance(self._writer, LineProtocol):
+            self._writer.pause_reading()
+
+    def _resume_reading(self) -> None:
+        """Resume reading once the event queue has room or a request is sent."""
+        self._reading_paused = False
+        self._read_allowed.set()
+        if isinstance(self._writer, LineProtocol):
+            self._writer.resume_reading()
+
+    def _handle_lost(self, err: Exception) -> None:
+        """Handle buffered protocol losing its connection."""
+        asyncio.create_task(self._handle_connection_error(err))
+
     async def _handle_connection_error(self, err: Exception):
         """Handle connection failures and schedule reconnect."""
         if self._reconnect_task:
             return
 
+        # The outage began with the last line received, not once it was noticed
+        self._outage_start = self._last_received
+        self._stats.disconnects_detected += 1
+        self._stats.last_time_to_detect = time.monotonic() - self._outage_start
+
         await self._disconnect()
 
         if self._reconnect_enabled:
@@ -171,21 +584,35 @@ class Connection:
 
     async def _reconnect(self):
         """Reconnect to server."""
+        attempt = 0
         try:
             while self._state != const.STATE_CONNECTED:
+                if attempt:
+                    await asyncio.sleep(self._reconnect_backoff(attempt))
+                attempt += 1
+                self._stats.reconnect_attempts += 1
                 try:
                     await self._connect()
                 except ConnectionError as err:
                     _LOGGER.warning("Failed reconnect to %s with '%s'", self._ip, err)
                     await self._disconnect()
-                    await asyncio.sleep(self._reconnect_delay)
                 else:
                     self._reconnect_task = None
-                    _LOGGER.info("Reconnected to %s", self._ip)
+                    outage = time.monotonic() - self._outage_start
+                    self._stats.last_outage_duration = outage
+                    _LOGGER.info("Reconnected to %s after %.1fs", self._ip, outage)
+                    self._dispatcher.send(const.STATE_RECONNECTED, outage)
         except Exception as err:  # pylint: disable=broad-except
             _LOGGER.exception("Unhandled exception %s('%s')", type(err).__name__, err)
             raise
 
+    def _reconnect_backoff(self, attempt: int) -> float:
+        """Return delay before a reconnect attempt, using full jitter."""
+        assert self._reconnect_delay is not None
+        return reconnect_backoff(
+            attempt, self._reconnect_delay_min, self._reconnect_delay
+        )
+
     async def disconnect(self):
         """Disconnect from server."""
         if self._state == const.STATE_DISCONNECTED:
@@ -209,14 +636,17 @@ class Connection:
 
     async def _disconnect(self):
         """Disconnect from server."""
-        if self._response_handler_task:
-            self._response_handler_task.cancel()
-            try:
-                await self._response_handler_task
-            except:  # pylint: disable=bare-except
-                # Ensure completes
-                pass
-            self._response_handler_task = None
+        await _cancel_task(self._response_handler_task)
+        self._response_handler_task = None
+        await _cancel_task(self._event_handler_task)
+        self._event_handler_task = None
+        await _cancel_task(self._heartbeat_task)
+        self._heartbeat_task = None
+
+        self._events.clear()
+        self._update_event_stats()
+        self._reading_paused = False
+        self._read_allowed.set()
 
         if self._writer:
             self._writer.close()
@@ -224,6 +654,10 @@ class Connection:
 
         self._reader = None
         self._pending_requests.clear()
+        for _, handle in self._tombstones.values():
+            handle.cancel()
+        self._tombstones.clear()
+        self._sequences.reset()
 
     async def send(self, request: Request) -> Response:
         """Send request to device"""
@@ -232,56 +666,99 @@ class Connection:
             _LOGGER.error(err)
             raise KaleidescapeError(err)
 
-        wait = 0.01
         assert self._timeout is not None
-        retries = self._timeout * (1 / wait)
-
-        while request.seq < 0:
-            try:
-                # Devices can only handle 10 concurrent requests. Find next available
-                # sequence number not in use.
-                request.seq = next(
-                    (i for i in range(0, 10) if i not in self._pending_requests)
-                )
-            except StopIteration as e:
-                await asyncio.sleep(wait)
-                retries = retries - 1
-                if retries == 0:
-                    raise ConnectionError from e
-                continue
-
+        request.seq = await self._sequences.acquire(self._timeout)
         self._pending_requests[request.seq] = request
+        if self._reading_paused:
+            self._resume_reading()
 
         try:
             assert self._writer
             writer = self._writer
-            writer.write(str(request).encode("latin-1") + SEPARATOR_BYTES)
+            writer.write(request.encode())
             await writer.drain()
             _LOGGER.debug("Request sent '%s'", request)
             response = await asyncio.wait_for(request.wait(), self._timeout)
         except (OSError, ConnectionError, asyncio.TimeoutError) as err:
+            self.clear(request)
             msg = f"Request '{request}' failed with '{format_error(err)}'"
             _LOGGER.warning(msg)
             raise KaleidescapeError(msg) from err
+        except BaseException:
+            self.clear(request)
+            raise
 
         return response
 
     def clear(self, request: Request):
-        """Clear request from the pending requests list, indicating response has been
-        received."""
-        if request.seq not in self._pending_requests:
-            _LOGGER.error("Request seq not registered '%s'", request)
-        else:
-            self._pending_requests.pop(request.seq)
+        """Clear request from the pending requests list, releasing its sequence.
+
+        Safe to call more than once. If the request is abandoned before all of its
+        responses arrive, the sequence is tombstoned rather than reused right away.
+        """
+        if self._pending_requests.get(request.seq) is not request:
+            # Already cleared, or the connection was reset since it was sent
+            return
+
+        self._pending_requests.pop(request.seq)
+
+        if request.done:
+            self._sequences.release(request.seq)
+            return
+
+        self._stats.requests_reclaimed += 1
+        _LOGGER.debug("Reclaimed abandoned request '%s'", request)
+        self._tombstones[request.seq] = (
+            request,
+            asyncio.get_running_loop().call_later(
+                TOMBSTONE_WINDOW, self._expire_tombstone, request.seq
+            ),
+        )
+
+    def _drop_late_response(self, response: Response) -> None:
+        """Drop a reply to an abandoned request, freeing its sequence once complete."""
+        self._stats.late_responses_dropped += 1
+        _LOGGER.debug("Dropped late response '%s'", response)
+        request, _ = self._tombstones[response.seq]
+        request.set(response)
+        if request.done:
+            self._expire_tombstone(response.seq)
+
+    def _expire_tombstone(self, seq: int) -> None:
+        """Return a tombstoned sequence number to the pool."""
+        tombstone = self._tombstones.pop(seq, None)
+        if tombstone is not None:
+            tombstone[1].cancel()
+            self._sequences.release(seq)
 
     @staticmethod
     async def resolve(host: str) -> str:
         """Resolve hostname to ip address."""
-        try:
-            res = await aiodns.DNSResolver().gethostbyname(host, socket.AF_INET)
-            if len(res.addresses) < 1:
-                raise ConnectionError("Unexpected zero length addresses response")
-        except aiodns.error.DNSError as err:
-            raise ConnectionError(f"Failed to resolve host {host}") from err
+        return (await _RESOLVER.resolve(host))[0]
+
+
+_RESOLVER = Resolver()
+
+
+def reconnect_backoff(attempt: int, delay_min: float, delay_max: float) -> float:
+    """Return delay before reconnect attempt number `attempt` (from 1).
+
+    The delay is random between `delay_min` and a ceiling doubling with each
+    attempt up to `delay_max` (exponential backoff with full jitter).
+    """
+    ceiling = min(delay_max, delay_min * 2 ** min(attempt, 32))
+    return random.uniform(delay_min, ceiling)
+
 
-        return res.addresses[0]
+async def _cancel_task(task: asyncio.Task | None) -> None:
+    """Cancel task and wait for it to complete, unless it is the current task."""
+    if task is None:
+        return
+    task.cancel()
+    if task is asyncio.current_task():
+        return
+    try:
+        await task
+    except:  # pylint: disable=bare-except
+        # Ensure completes
+        pass
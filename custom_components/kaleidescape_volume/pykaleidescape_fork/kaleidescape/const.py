@@ -6,11 +6,26 @@ LOCAL_CPDID = "01"
 DEFAULT_PROTOCOL_PORT = 10000
 DEFAULT_PROTOCOL_TIMEOUT = 10.0
 DEFAULT_RECONNECT_DELAY = 10.0
+DEFAULT_RECONNECT_DELAY_MIN = 0.5
+CONNECT_RACE_DELAY = 0.25
+DEFAULT_DNS_TTL = 300.0
+DEFAULT_EVENT_QUEUE_SIZE = 64
+DEFAULT_HEARTBEAT_INTERVAL = 30.0
+DEFAULT_HEARTBEAT_TIMEOUT = 5.0
+DEFAULT_KEEPALIVE_IDLE = 10
+DEFAULT_KEEPALIVE_INTERVAL = 5
+DEFAULT_KEEPALIVE_COUNT = 3
+
+# Buffer overflow policies
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
 
 # Connection
 STATE_CONNECTED = "connected"
 STATE_DISCONNECTED = "disconnected"
 STATE_RECONNECTING = "reconnecting"
+STATE_RECONNECTED = "reconnected"
 
 # Control Protocol Statuses
 SUCCESS = 0
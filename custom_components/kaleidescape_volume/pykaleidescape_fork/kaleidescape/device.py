@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Awaitable, Callable, Iterable
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, TypeVar, cast
+from typing import TYPE_CHECKING, ClassVar, NamedTuple, TypeVar, cast
 
 from . import const
 from . import message as messages
-from .connection import Connection
+from .connection import Connection, LivenessOptions
 from .dispatcher import Dispatcher
+from .subscription import EventSubscription
 
 T = TypeVar("T")
 
@@ -25,6 +27,20 @@ if TYPE_CHECKING:
 
     RequestT = TypeVar("RequestT", bound=Request)
 
+EventUpdater = Callable[["Response"], None]
+PostUpdateHook = Callable[["Response"], Awaitable[None]]
+
+
+class EventHandler(NamedTuple):
+    """Names of the device methods mirroring an event into device state.
+
+    The updater is called synchronously with the event; the optional post update
+    hook is awaited afterwards, for follow up requests.
+    """
+
+    updater: str
+    post_update: str | None = None
+
 
 class Device:
     """Class representing hardware.
@@ -33,6 +49,34 @@ class Device:
     device state by monitoring system events.
     """
 
+    # Events mirrored into device state, by message class. Subclasses extend this
+    # with `{**Device.event_handlers, ...}`, plugins use `register_event_handler`.
+    event_handlers: ClassVar[dict[type[Response], EventHandler]] = {
+        # System
+        messages.DevicePowerState: EventHandler(
+            "_update_device_power_state", "_post_update_device_power_state"
+        ),
+        messages.SystemReadinessState: EventHandler("_update_system_readiness_state"),
+        messages.FriendlyName: EventHandler("_update_friendly_name"),
+        # OSD
+        messages.UiState: EventHandler("_update_ui_state"),
+        messages.PlayingTitleName: EventHandler("_update_playing_title_name"),
+        messages.HighlightedSelection: EventHandler("_update_highlighted_selection"),
+        # Movie
+        messages.PlayStatus: EventHandler(
+            "_update_play_status", "_post_update_play_status"
+        ),
+        messages.MovieMediaType: EventHandler("_update_movie_media_type"),
+        # Automation
+        messages.MovieLocation: EventHandler("_update_movie_location"),
+        messages.VideoColor: EventHandler("_update_video_color"),
+        messages.VideoMode: EventHandler("_update_video_mode"),
+        messages.ScreenMask: EventHandler("_update_screen_mask"),
+        messages.ScreenMask2: EventHandler("_update_screen_mask2"),
+        messages.CinemascapeMode: EventHandler("_update_cinemascape_mode"),
+        messages.CinemascapeMask: EventHandler("_update_cinemascape_mask"),
+    }
+
     def __init__(
         self,
         host: str,
@@ -41,6 +85,13 @@ class Device:
         timeout: float = const.DEFAULT_PROTOCOL_TIMEOUT,
         reconnect: bool = True,
         reconnect_delay: float = const.DEFAULT_RECONNECT_DELAY,
+        reconnect_delay_min: float = const.DEFAULT_RECONNECT_DELAY_MIN,
+        race_addresses: bool = True,
+        buffered_protocol: bool = False,
+        event_queue_size: int = const.DEFAULT_EVENT_QUEUE_SIZE,
+        event_overflow: str = const.OVERFLOW_BLOCK,
+        liveness: LivenessOptions | None = None,
+        lazy_responses: bool = False,
     ) -> None:
         """Initialize device."""
         self._host = host
@@ -48,9 +99,21 @@ class Device:
         self._timeout = timeout
         self._reconnect_enabled = reconnect
         self._reconnect_delay = reconnect_delay
+        self._reconnect_delay_min = reconnect_delay_min
+        self._race_addresses = race_addresses
 
         self._dispatcher = Dispatcher()
-        self._connection = Connection(self._dispatcher, self._handle_event)
+        self._user_event_dispatcher = Dispatcher()
+        self._connection = Connection(
+            self._dispatcher,
+            self._handle_event,
+            buffered_protocol=buffered_protocol,
+            on_user_event=self._handle_user_event,
+            event_queue_size=event_queue_size,
+            event_overflow=event_overflow,
+            liveness=liveness,
+            lazy_responses=lazy_responses,
+        )
 
         self.system = System()
         self.power = Power()
@@ -59,21 +122,30 @@ class Device:
         self.automation = Automation()
 
         self._signal: Signal | None = None
+        self._previous_play_status: str | None = None
+        self._event_handlers: dict[
+            type[Response], tuple[EventUpdater, PostUpdateHook | None]
+        ] = {
+            message: (
+                getattr(self, handler.updater),
+                getattr(self, handler.post_update) if handler.post_update else None,
+            )
+            for message, handler in self.event_handlers.items()
+        }
 
     async def connect(self) -> None:
         """Connect to hardware."""
         if self.is_connected:
             return
 
-        # Convert hostname to ip (if not already)
-        self._host = await Connection.resolve(self._host)
-
         await self._connection.connect(
             self._host,
             port=self._port,
             timeout=self._timeout,
             reconnect=self._reconnect_enabled,
             reconnect_delay=self._reconnect_delay,
+            reconnect_delay_min=self._reconnect_delay_min,
+            race_addresses=self._race_addresses,
         )
 
         results = await asyncio.gather(
@@ -362,6 +434,7 @@ class Device:
         return cast(messages.PlayStatus, res)
 
     def _update_play_status(self, res: messages.PlayStatus) -> None:
+        self._previous_play_status = self.movie.play_status
         self.movie.play_status = res.field_play_status
         self.movie.play_speed = res.field_play_speed
         self.movie.title_number = res.field_title_number
@@ -494,67 +567,82 @@ class Device:
         req = request(zone, fields)
         return await req.send(self._connection)
 
+    def register_event_handler(
+        self,
+        message: type[Response] | str,
+        updater: EventUpdater,
+        post_update: PostUpdateHook | None = None,
+    ) -> None:
+        """Mirror events of a message class or name into state, replacing any
+        existing handler."""
+        if isinstance(message, str):
+            if message not in messages.registry:
+                raise ValueError(f"Unknown message '{message}'")
+            message = messages.registry[message]
+        self._event_handlers[message] = (updater, post_update)
+
     async def _handle_event(self, response: Response) -> None:
         """Handle events sent by hardware."""
+        handler = self._event_handlers.get(type(response))
+        if handler is not None:
+            updater, post_update = handler
+            updater(response)
+            if post_update is not None:
+                await post_update(response)
+
+        if self._dispatcher.wants(response.name):
+            self._dispatcher.send(response.name, response.fields)
+
+    async def _post_update_device_power_state(
+        self, res: messages.DevicePowerState  # pylint: disable=unused-argument
+    ) -> None:
+        await self.refresh()
 
-        # System
-        if isinstance(response, messages.DevicePowerState):
-            self._update_device_power_state(response)
-            await self.refresh()
-        elif isinstance(response, messages.SystemReadinessState):
-            self._update_system_readiness_state(response)
-        elif isinstance(response, messages.FriendlyName):
-            self._update_friendly_name(response)
-
-        # OSD
-        elif isinstance(response, messages.UiState):
-            self._update_ui_state(response)
-        elif isinstance(response, messages.PlayingTitleName):
-            self._update_playing_title_name(response)
-        elif isinstance(response, messages.HighlightedSelection):
-            self._update_highlighted_selection(response)
-
-        # Movie
-        elif isinstance(response, messages.PlayStatus):
-            old_mode = self.movie.play_status
-            self._update_play_status(response)
-            if (
-                self.power.state == const.DEVICE_POWER_STATE_ON
-                and self.movie.play_status != const.PLAY_STATUS_NONE
-            ):
-                if old_mode == const.PLAY_STATUS_NONE or old_mode is None:
-                    res = await self.get_content_details(self.osd.highlighted)
-                    self._update_content_details(
-                        cast(messages.ContentDetailsOverview, res)
-                    )
-            elif self.movie.title:
-                self._update_content_details()
-        elif isinstance(response, messages.MovieMediaType):
-            self._update_movie_media_type(response)
-
-        # Automation
-        elif isinstance(response, messages.MovieLocation):
-            self._update_movie_location(response)
-        elif isinstance(response, messages.VideoColor):
-            self._update_video_color(response)
-        elif isinstance(response, messages.VideoMode):
-            self._update_video_mode(response)
-        elif isinstance(response, messages.ScreenMask):
-            self._update_screen_mask(response)
-        elif isinstance(response, messages.ScreenMask2):
-            self._update_screen_mask2(response)
-        elif isinstance(response, messages.CinemascapeMode):
-            self._update_cinemascape_mode(response)
-        elif isinstance(response, messages.CinemascapeMask):
-            self._update_cinemascape_mask(response)
-
-        self._dispatcher.send(response.name, response.fields)
+    async def _post_update_play_status(
+        self, res: messages.PlayStatus  # pylint: disable=unused-argument
+    ) -> None:
+        if (
+            self.power.state == const.DEVICE_POWER_STATE_ON
+            and self.movie.play_status != const.PLAY_STATUS_NONE
+        ):
+            if self._previous_play_status in (const.PLAY_STATUS_NONE, None):
+                details = await self.get_content_details(self.osd.highlighted)
+                self._update_content_details(details)
+        elif self.movie.title:
+            self._update_content_details()
+
+    def _handle_user_event(self, value: str) -> None:
+        """Handle user defined events as soon as they are received.
+
+        Listeners get the same arguments as from `dispatcher`, but are called before
+        the message is fully parsed or any device state is updated.
+        """
+        self._user_event_dispatcher.send(const.USER_DEFINED_EVENT, value.split("="))
 
     @property
     def dispatcher(self) -> Dispatcher:
         """Return dispatcher instance."""
         return self._dispatcher
 
+    @property
+    def user_event_dispatcher(self) -> Dispatcher:
+        """Return dispatcher instance receiving only user defined events."""
+        return self._user_event_dispatcher
+
+    def events(
+        self,
+        names: Iterable[str] | None = None,
+        maxsize: int = const.DEFAULT_EVENT_QUEUE_SIZE,
+        overflow: str = const.OVERFLOW_DROP_OLDEST,
+    ) -> EventSubscription:
+        """Return async iterator over events sent by `dispatcher`.
+
+        Only events in `names` are received, or all of them when None. At most
+        `maxsize` events are buffered for a slow consumer, then dropped or
+        coalesced by `overflow`, see `EventSubscription`.
+        """
+        return EventSubscription(self._dispatcher, names, maxsize, overflow)
+
     @property
     def connection(self) -> Connection:
         """Return connection instance."""
@@ -596,7 +684,7 @@ class Device:
         return self.system.music_zones - self.system.movie_zones > 0
 
 
-@dataclass
+@dataclass(slots=True)
 class System:
     """System related properties."""
 
@@ -611,7 +699,7 @@ class System:
     music_zones: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Power:
     """Power related state."""
 
@@ -620,7 +708,7 @@ class Power:
     zone: list[str] | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class OSD:
     """On Screen Display related state."""
 
@@ -632,7 +720,7 @@ class OSD:
     highlighted: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Movie:
     """Movie media related state."""
 
@@ -664,7 +752,7 @@ class Movie:
     chapter_location: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Automation:
     """Automation related state."""
 
@@ -4,20 +4,33 @@ from __future__ import annotations
 
 import asyncio
 import functools
+import itertools
 import logging
-from collections.abc import Awaitable, Callable
+from collections.abc import Callable, Iterable
 from typing import Any
 
 _LOGGER = logging.getLogger(__name__)
 
+_order = itertools.count()
+
 
 class Signal:
     """Container for a named target function that receives events"""
 
-    def __init__(self, dispatcher: Dispatcher, target: Callable):
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        target: Callable,
+        events: frozenset[str] | None = None,
+        predicate: Callable[..., bool] | None = None,
+    ):
         """Initialize signal."""
         self.dispatcher = dispatcher
         self.target = target
+        self.events = events
+        self.predicate = predicate
+        self.is_async = _is_coroutine_function(target)
+        self.order = next(_order)
 
     def disconnect(self) -> None:
         """Removes signal from the dispatcher."""
@@ -25,29 +38,70 @@ class Signal:
 
 
 class Dispatcher:
-    """Handle event dispatching."""
+    """Handle event dispatching.
+
+    Signals connected with a set of event names are only called for those events;
+    signals without one are called for every event. Either may also have a
+    predicate, called with the event arguments, deciding whether to deliver.
+    """
 
     def __init__(self):
         """Initialize dispatcher."""
         self._signals: list[Signal] = []
+        self._by_event: dict[str, list[Signal]] = {}
+        self._all_events: list[Signal] = []
         self._loop = asyncio.get_event_loop()
         self._disconnects = []
 
-    def connect(self, target: Callable) -> Signal:
-        """Return a new signal that runs the target function."""
-        signal = Signal(self, target)
+    def wants(self, event: str) -> bool:
+        """Return if any signal may be called for event."""
+        return bool(self._all_events) or event in self._by_event
+
+    def connect(
+        self,
+        target: Callable,
+        events: Iterable[str] | None = None,
+        predicate: Callable[..., bool] | None = None,
+    ) -> Signal:
+        """Return a new signal that runs the target function.
+
+        With `events`, the target is only called for the named events.
+        """
+        signal = Signal(
+            self, target, frozenset(events) if events is not None else None, predicate
+        )
         self._signals.append(signal)
+        if signal.events is None:
+            self._all_events.append(signal)
+        else:
+            for event in signal.events:
+                self._by_event.setdefault(event, []).append(signal)
         return signal
 
     def send(self, *args: Any) -> None:
-        """Call named signal's target function with args."""
-        for signal in self._signals:
-            self._call_target(signal.target, *args)
-        if len(self._signals) > 0:
+        """Call target function of signals listening to the event with args."""
+        signals = self._by_event.get(args[0], ()) if args else ()
+        if signals and self._all_events:
+            # Keep the order signals were connected in
+            signals = sorted([*signals, *self._all_events], key=lambda s: s.order)
+        elif not signals:
+            signals = self._all_events
+
+        called = 0
+        for signal in signals:
+            if signal.predicate is not None and not signal.predicate(*args):
+                continue
+            if signal.is_async:
+                self._loop.create_task(signal.target(*args))
+            else:
+                signal.target(*args)
+            called += 1
+
+        if called and _LOGGER.isEnabledFor(logging.DEBUG):
             _LOGGER.debug(
                 "Dispatched signal to %s listener%s with %s",
-                len(self._signals),
-                "s" if len(self._signals) > 1 else "",
+                called,
+                "s" if called > 1 else "",
                 args,
             )
 
@@ -56,17 +110,25 @@ class Dispatcher:
         try:
             self._signals.remove(signal)
         except ValueError:
-            pass
+            return
+        if signal.events is None:
+            self._all_events.remove(signal)
+            return
+        for event in signal.events:
+            signals = self._by_event[event]
+            signals.remove(signal)
+            if not signals:
+                del self._by_event[event]
 
     def disconnect_all(self) -> None:
         """Disconnect all signals."""
         self._signals.clear()
+        self._by_event.clear()
+        self._all_events.clear()
+
 
-    def _call_target(self, target: Callable, *args) -> Awaitable | None:
-        check_target = target
-        while isinstance(check_target, functools.partial):
-            check_target = check_target.func
-        if asyncio.iscoroutinefunction(check_target):
-            return self._loop.create_task(target(*args))
-        target(*args)
-        return None
+def _is_coroutine_function(target: Callable) -> bool:
+    """Return if target, unwrapping partials, is a coroutine function."""
+    while isinstance(target, functools.partial):
+        target = target.func
+    return asyncio.iscoroutinefunction(target)
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import logging
 import re
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, ClassVar
 
 from . import const
 from .const import LOCAL_CPDID
@@ -23,6 +24,40 @@ DEVICEID_FORMAT = re.compile(r"^(?P<id>\d\d|#[0-9A-F]+|\?\?)(?:\.(?P<zone>\d\d))
 SEQ_FORMAT = re.compile(r"^(?:\d|!)/")
 STATUS_FORMAT = re.compile(r"^\d\d\d:")
 NAME_FORMAT = re.compile(r"^(?:([^:]+):/?|/)")
+CHECKSUM_FORMAT = re.compile(r"\d+$")
+FIELD_SPECIAL_FORMAT = re.compile(r"[\\:/]")
+DETAIL_LINES_FORMAT = re.compile("[\n\r]+")
+
+# Complete headers in a single match; the name is empty for messages without one
+_HEADER = r"(?P<id>\d\d|#[0-9A-F]+|\?\?)(?:\.(?P<zone>\d\d))?/(?P<seq>\d|!)/"
+_NAME = r"(?:(?P<name>[^:]+):|(?=/))"
+REQUEST_HEADER_FORMAT = re.compile(_HEADER + _NAME)
+RESPONSE_HEADER_FORMAT = re.compile(_HEADER + r"(?P<status>\d\d\d):" + _NAME)
+USER_DEFINED_EVENT_HEADER = f"/!/000:{const.USER_DEFINED_EVENT}:"
+
+ESCAPES = {
+    "r": "\r",
+    "n": "\n",
+    "t": "\t",
+    "/": "/",
+    "\\": "\\",
+    ":": ":",
+    # Protocol bug: newline chars are not coming in encoded
+    "\n": "\n",
+    "\r": "\r",
+}
+
+# Characters escaped in outgoing fields
+FIELD_ESCAPE_FORMAT = re.compile(r"[\\:/\n\r\t]")
+FIELD_ESCAPES = {
+    "\\": "\\\\",
+    ":": "\\:",
+    "/": "\\/",
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+}
+LINE_TERMINATOR = b"\n"
 
 registry = {}
 
@@ -35,10 +70,68 @@ def register(cls):
     return cls
 
 
-class MessageParser:
-    """Class for parsing messages from the hardware device."""
+def encode_fields(fields: list[str]) -> bytes:
+    """Returns fields escaped and encoded for a request, each followed by a colon."""
+    escaped = [
+        FIELD_ESCAPE_FORMAT.sub(_escape, field)
+        if FIELD_ESCAPE_FORMAT.search(field)
+        else field
+        for field in fields
+    ]
+    return (":".join(escaped) + ":").encode("latin-1")
+
+
+@functools.lru_cache(maxsize=256)
+def _encode_fields_cached(fields: tuple[str, ...]) -> bytes:
+    return encode_fields(list(fields))
+
+
+def _escape(match: re.Match) -> str:
+    return FIELD_ESCAPES[match.group()]
+
 
-    def __init__(self, message: str, *args):
+def parse_user_defined_event(message: str) -> str | None:
+    """Returns the value of a USER_DEFINED_EVENT message, or None for other messages.
+
+    Only the header and the event value are examined, so this is much cheaper than
+    a full parse. The rest of the message is left for `Response.factory`.
+    """
+    start = message.find("/")
+    if start < 0 or not message.startswith(USER_DEFINED_EVENT_HEADER, start):
+        return None
+    start += len(USER_DEFINED_EVENT_HEADER)
+    end = message.find(":", start)
+    if end < 0:
+        return None
+    value = message[start:end]
+    if "\\" in value:
+        # Escaped values are rare, leave them to the full parser
+        return MessageParser(message).fields[0]
+    return value
+
+
+class MessageParser:
+    """Class for parsing messages from the hardware device.
+
+    With `lazy`, only the header is parsed; fields and checksum are left for
+    `parse_fields`.
+    """
+
+    __slots__ = (
+        "message",
+        "device_id",
+        "zone",
+        "seq",
+        "status",
+        "name",
+        "fields",
+        "checksum",
+        "fields_pos",
+        "parsed",
+        "_is_request",
+    )
+
+    def __init__(self, message: str, *args, lazy: bool = False):
         """Parses string message into its fields."""
         self.message = message
 
@@ -52,14 +145,41 @@ class MessageParser:
 
         is_request: bool = args[0] if len(args) > 0 else False
 
-        pos = self._parse_device_id(0)
-        pos = self._parse_seq(pos)
-        if not is_request:
-            pos = self._parse_status(pos)
-        pos = self._parse_name(pos)
-        pos = self._parse_fields(pos)
-        if not is_request:
-            self._parse_checksum(pos)
+        header = (REQUEST_HEADER_FORMAT if is_request else RESPONSE_HEADER_FORMAT).match(
+            message
+        )
+        if header:
+            self.device_id = header.group("id")
+            zone = header.group("zone")
+            self.zone = int(zone) if zone else 0
+            seq = header.group("seq")
+            self.seq = int(seq) if seq != "!" else -1
+            if not is_request:
+                self.status = int(header.group("status"))
+            self.name = header.group("name") or ""
+            pos = header.end()
+        else:
+            # Parse stage by stage to report which part of the header is invalid
+            pos = self._parse_device_id(0)
+            pos = self._parse_seq(pos)
+            if not is_request:
+                pos = self._parse_status(pos)
+            pos = self._parse_name(pos)
+
+        self.fields_pos = pos
+        self._is_request = is_request
+        self.parsed = False
+        if not lazy:
+            self.parse_fields()
+
+    def parse_fields(self) -> list[str]:
+        """Parses fields and checksum following the header, returning fields."""
+        if not self.parsed:
+            self.fields, self.checksum = decode_fields(
+                self.message, self.fields_pos, self._is_request
+            )
+            self.parsed = True
+        return self.fields
 
     def _parse_device_id(self, pos: int) -> int:
         match = re.search(DEVICEID_FORMAT, self.message[pos:])
@@ -88,58 +208,6 @@ class MessageParser:
         self.name = self.message[pos : pos + match.end(1)]
         return pos + match.end(1) + 1
 
-    def _parse_fields(self, pos: int) -> int:
-        field: str = ""
-        escaped: bool = False
-
-        while pos < len(self.message):
-            char = self.message[pos]
-            if escaped:
-                if char == "d":
-                    field += chr(int(self.message[pos + 1 : pos + 4]))
-                    pos = pos + 3
-                elif char == "r":
-                    field += "\r"
-                elif char == "n":
-                    field += "\n"
-                elif char == "t":
-                    field += "\t"
-                elif char == "/":
-                    field += "/"
-                elif char == "\\":
-                    field += "\\"
-                elif char == ":":
-                    field += ":"
-                elif char == "\n":
-                    # Protocol bug: newline chars are not coming in encoded
-                    field += "\n"
-                elif char == "\r":
-                    # Same bug as above
-                    field += "\r"
-                escaped = False
-            elif char == "\\":
-                escaped = True
-            elif char == "/":
-                break
-            elif char == ":":
-                self.fields.append(field)
-                field = ""
-            else:
-                field += char
-
-            pos = pos + 1
-
-        if field:
-            # Last field not terminated with colon
-            raise MessageParseError(const.ERROR_INVALID_PARAMETER, self.message)
-
-        return pos + 1
-
-    def _parse_checksum(self, pos: int):
-        if not re.match(r"^\d+$", self.message[pos:]):
-            raise MessageParseError(const.ERROR_CHECKSUM_ERROR, self.message)
-        self.checksum = int(self.message[pos:])
-
     def __str__(self) -> str:
         return self.message
 
@@ -158,9 +226,106 @@ class MessageParser:
         )
 
 
-class Message:
+def decode_fields(
+    message: str, pos: int, is_request: bool = False
+) -> tuple[list[str], int]:
+    """Returns the fields of message starting at pos, and the checksum following
+    them for responses."""
+    if message.find("\\", pos) < 0:
+        fields, pos = _split_fields(message, pos)
+    else:
+        fields, pos = _parse_fields(message, pos)
+    if is_request:
+        return fields, 0
+    if not CHECKSUM_FORMAT.match(message, pos):
+        raise MessageParseError(const.ERROR_CHECKSUM_ERROR, message)
+    return fields, int(message[pos:])
+
+
+def _split_fields(message: str, pos: int) -> tuple[list[str], int]:
+    """Splits fields of a message without escapes."""
+    end = message.find("/", pos)
+    if end < 0:
+        end = len(message)
+
+    fields = message[pos:end].split(":")
+    if fields[-1]:
+        # Last field not terminated with colon
+        raise MessageParseError(const.ERROR_INVALID_PARAMETER, message)
+    fields.pop()
+
+    return fields, end + 1
+
+
+def _parse_fields(message: str, pos: int) -> tuple[list[str], int]:
+    """Parses fields of a message with escapes."""
+    fields: list[str] = []
+    field: list[str] = []
+
+    while True:
+        match = FIELD_SPECIAL_FORMAT.search(message, pos)
+        if not match:
+            field.append(message[pos:])
+            pos = max(pos, len(message))
+            break
+
+        start = match.start()
+        if start > pos:
+            field.append(message[pos:start])
+        char = message[start]
+
+        if char == "/":
+            pos = start
+            break
+        if char == ":":
+            fields.append("".join(field))
+            field = []
+            pos = start + 1
+        elif start + 1 >= len(message):
+            # Trailing backslash
+            pos = len(message)
+            break
+        elif message[start + 1] == "d":
+            field.append(chr(int(message[start + 2 : start + 5])))
+            pos = start + 5
+        else:
+            escaped = ESCAPES.get(message[start + 1])
+            if escaped:
+                field.append(escaped)
+            pos = start + 2
+
+    if "".join(field):
+        # Last field not terminated with colon
+        raise MessageParseError(const.ERROR_INVALID_PARAMETER, message)
+
+    return fields, pos + 1
+
+
+class _SlottedMeta(type):
+    """Gives message classes empty `__slots__` unless they declare their own, so
+    message instances never carry a `__dict__`."""
+
+    def __new__(mcs, name, bases, namespace, **kwargs):
+        namespace.setdefault("__slots__", ())
+        return super().__new__(mcs, name, bases, namespace, **kwargs)
+
+
+class Message(metaclass=_SlottedMeta):
     """Abstract class for both request messages (command) and response messages
-    (command and event)."""
+    (command and event).
+
+    Subclasses store `_fields`: requests in a slot, responses behind a property
+    decoding them on first use.
+    """
+
+    __slots__ = (
+        "_device_id",
+        "_zone",
+        "_seq",
+        "_status",
+        "_message",
+        "_type",
+    )
 
     name: str = ""
     multiline = False
@@ -233,7 +398,21 @@ class Message:
 class Request(Message):
     """Class representing a command request sent to hardware device."""
 
+    __slots__ = ("_fields", "_responses", "_event", "_completed")
+
     log_invalid_request: bool = True
+    # Cache encoded fields, for requests repeatedly sent with the same few values
+    cache_fields: bool = False
+
+    # Encoded start of the message for each sequence number; the last is for "!"
+    _headers: ClassVar[list[bytes]] = []
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._headers = [
+            f"{LOCAL_CPDID}/{seq}/{cls.name}:".encode("latin-1")
+            for seq in (*range(10), "!")
+        ]
 
     def __init__(self, zone: int = 0, fields: list[str] | None = None):
         """Initializes request."""
@@ -243,6 +422,7 @@ class Request(Message):
         self._type = MESSAGE_TYPE_REQUEST
         self._responses: list[Response] = []
         self._event = asyncio.Event()
+        self._completed = asyncio.Event()
 
     @property
     def fields(self) -> list[str]:
@@ -252,13 +432,20 @@ class Request(Message):
     async def send(self, connection: Connection) -> list[Response]:
         """Sends request to hardware device, returning one or more responses."""
         self._event.clear()
+        self._completed.clear()
         self._responses.clear()
 
         response = await connection.send(self)
 
-        if not response.multiline:
+        try:
+            return await self._collect(connection, response)
+        finally:
             connection.clear(self)
 
+    async def _collect(
+        self, connection: Connection, response: Response
+    ) -> list[Response]:
+        """Checks the first response, waiting for the rest of a multiline group."""
         if response.is_error:
             lvl = logging.ERROR
             if (
@@ -278,37 +465,65 @@ class Request(Message):
                 )
                 raise KaleidescapeError("Response count expected")
 
-            async def collector():
-                while (len(self._responses) - 1) < response.count:
-                    await asyncio.sleep(0)
-
             try:
-                await asyncio.wait_for(collector(), connection.timeout)
+                await asyncio.wait_for(self._completed.wait(), connection.timeout)
             except asyncio.TimeoutError as error:
                 err = f"Command {repr(self)} timed out waiting for responses"
                 _LOGGER.warning(err)
                 raise KaleidescapeError(err) from error
 
-            connection.clear(self)
             return self._responses
 
         return [response]
 
+    @property
+    def done(self) -> bool:
+        """Returns if all responses to the request have been received."""
+        return self._completed.is_set()
+
     async def wait(self) -> Response:
         """Wait until the event is set."""
         await self._event.wait()
         return self._responses[0]
 
     def set(self, response: Response) -> None:
-        """Complete request."""
+        """Complete request.
+
+        The first response releases `wait`. Multiline responses are complete once
+        the number of rows announced by the first response have been received.
+        """
         self._responses.append(response)
         self._event.set()
 
+        first = self._responses[0]
+        if not first.multiline:
+            self._completed.set()
+            return
+
+        try:
+            count = first.count
+        except (ValueError, IndexError):
+            # Malformed count, let send report it
+            self._completed.set()
+            return
+
+        if len(self._responses) - 1 >= count:
+            self._completed.set()
+
+    def encode(self) -> bytes:
+        """Returns the message as sent to the hardware device, including the line
+        terminator."""
+        if not self._fields:
+            return self._headers[self.seq] + LINE_TERMINATOR
+        if self.cache_fields:
+            fields = _encode_fields_cached(tuple(self._fields))
+        else:
+            fields = encode_fields(self._fields)
+        return b"".join((self._headers[self.seq], fields, LINE_TERMINATOR))
+
     def __str__(self) -> str:
         if self._message == "":
-            seq = "!" if self.seq < 0 else str(self.seq)
-            fields = ":".join(self._fields) + ":" if self._fields else ""
-            self._message = f"{self._device_id}/{seq}/{self.name}:{fields}"
+            self._message = self.encode()[:-1].decode("latin-1")
         return self._message
 
     def __repr__(self) -> str:
@@ -324,18 +539,27 @@ class Request(Message):
 class Response(Message):
     """Class representing a command response or event from hardware device."""
 
+    # Fields are decoded from the message at `_fields_pos`, unless already done
+    __slots__ = ("_decoded", "_fields_pos")
+
     def __init__(self, parsed: MessageParser):
         """Initializes response."""
         super().__init__(
             parsed.device_id, parsed.zone, parsed.seq, parsed.status, parsed.fields
         )
+        self._fields_pos = -1 if parsed.parsed else parsed.fields_pos
         self._message = parsed.message
         self._type = MESSAGE_TYPE_EVENT if parsed.seq < 0 else MESSAGE_TYPE_RESPONSE
 
     @classmethod
-    def factory(cls, message: str) -> Response:
-        """Returns a new response object for message."""
-        parsed = MessageParser(message)
+    def factory(cls, message: str, lazy: bool = False) -> Response:
+        """Returns a new response object for message.
+
+        With `lazy`, only the header is parsed up front. Fields are decoded the first
+        time they are read, which is also when an invalid field or checksum raises
+        `MessageParseError`.
+        """
+        parsed = MessageParser(message, lazy=lazy)
         if parsed.name in registry:
             return registry[parsed.name](parsed)
         return cls(parsed)
@@ -360,6 +584,18 @@ class Response(Message):
         """Returns fields in the message."""
         return self._fields
 
+    @property
+    def _fields(self) -> list[str]:
+        """Returns fields, decoding those of a lazy response on first use."""
+        if self._fields_pos >= 0:
+            self._decoded = decode_fields(self._message, self._fields_pos)[0]
+            self._fields_pos = -1
+        return self._decoded
+
+    @_fields.setter
+    def _fields(self, value: list[str]) -> None:
+        self._decoded = value
+
     def __repr__(self) -> str:
         return (
             f"{type(self).__name__}("
@@ -853,12 +1089,25 @@ class GetContentDetails(Request):
 class ContentDetailsOverview(Response):
     """Class for CONTENT_DETAILS_OVERVIEW messages."""
 
+    __slots__ = ("details", "_detail_lines")
+
     name = const.CONTENT_DETAILS_OVERVIEW
     multiline = True
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.details: dict[str, str] = {}
+        self._detail_lines: dict[str, list[str]] = {}
+
+    def _lines(self, key: str) -> list[str]:
+        """Returns a multiline detail as a list of lines, splitting it once."""
+        if key not in self.details:
+            return []
+        value = self.details[key]
+        lines = self._detail_lines.get(value)
+        if lines is None:
+            lines = self._detail_lines[value] = DETAIL_LINES_FORMAT.split(value)
+        return lines
 
     @property
     def count(self) -> int:
@@ -925,9 +1174,7 @@ class ContentDetailsOverview(Response):
     @property
     def field_actors(self) -> list[str]:
         """Returns actors."""
-        if "Actors" in self.details:
-            return re.split("[\n\r]+", self.details["Actors"])
-        return []
+        return self._lines("Actors")
 
     @property
     def field_director(self) -> str:
@@ -939,9 +1186,7 @@ class ContentDetailsOverview(Response):
     @property
     def field_directors(self) -> list[str]:
         """Returns directors."""
-        if "Directors" in self.details:
-            return re.split("[\n\r]+", self.details["Directors"])
-        return []
+        return self._lines("Directors")
 
     @property
     def field_genre(self) -> str:
@@ -953,9 +1198,7 @@ class ContentDetailsOverview(Response):
     @property
     def field_genres(self) -> list[str]:
         """Returns genres."""
-        if "Genres" in self.details:
-            return re.split("[\n\r]+", self.details["Genres"])
-        return []
+        return self._lines("Genres")
 
     @property
     def field_synopsis(self) -> str:
@@ -1294,6 +1537,7 @@ class SendEvent(Request):
     """Class for SEND_EVENT messages."""
 
     name = const.SEND_EVENT
+    cache_fields = True
 
 
 @register
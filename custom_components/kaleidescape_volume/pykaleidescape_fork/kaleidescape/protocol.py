@@ -0,0 +1,166 @@
+"""Buffered protocol splitting the device's byte stream into lines."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+INITIAL_BUFFER_SIZE = 16 * 1024
+MAX_LINE_LENGTH = 1024 * 1024
+NEWLINE = 0x0A
+WHITESPACE = b" \t\r\n\x0b\x0c"
+
+
+class LineProtocol(asyncio.BufferedProtocol):
+    """Protocol receiving into a reusable buffer and emitting decoded lines.
+
+    Every complete line in a receive is split out in a single pass and decoded
+    once, straight from the buffer. Also provides the subset of the
+    `asyncio.StreamWriter` interface used by `Connection`.
+    """
+
+    def __init__(
+        self,
+        on_line: Callable[[str], None],
+        on_lost: Callable[[Exception], None] | None = None,
+    ) -> None:
+        """Initializes protocol."""
+        self._on_line = on_line
+        self._on_lost = on_lost
+        self._buffer = bytearray(INITIAL_BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._end = 0
+        self._transport: asyncio.Transport | None = None
+        self._paused = False
+        self._drain_waiters: deque[asyncio.Future[None]] = deque()
+        self._closing = False
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store transport."""
+        self._transport = transport  # type: ignore[assignment]
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Return the free tail of the receive buffer."""
+        if self._end == len(self._buffer):
+            self._grow()
+        return self._view[self._end :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Emit every complete line received so far."""
+        buffer = self._buffer
+        end = self._end + nbytes
+        start = 0
+
+        while True:
+            newline = buffer.find(NEWLINE, start, end)
+            if newline < 0:
+                break
+            self._emit(start, newline)
+            start = newline + 1
+
+        if start:
+            # Keep the partial line at the front of the buffer
+            remaining = end - start
+            buffer[:remaining] = buffer[start:end]
+            end = remaining
+
+        self._end = end
+
+    def _emit(self, start: int, stop: int) -> None:
+        """Decode a line between start and stop, trimming surrounding whitespace."""
+        buffer = self._buffer
+        while start < stop and buffer[start] in WHITESPACE:
+            start += 1
+        while stop > start and buffer[stop - 1] in WHITESPACE:
+            stop -= 1
+        if start == stop:
+            return
+        try:
+            self._on_line(str(self._view[start:stop], "latin-1"))
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.exception("Unhandled exception %s('%s')", type(err).__name__, err)
+
+    def _grow(self) -> None:
+        """Enlarge the receive buffer, discarding an over-long line."""
+        size = len(self._buffer)
+        if size >= MAX_LINE_LENGTH:
+            _LOGGER.error("Discarding line longer than %s bytes", MAX_LINE_LENGTH)
+            self._end = 0
+            return
+        buffer = bytearray(size * 2)
+        buffer[: self._end] = self._buffer[: self._end]
+        self._buffer = buffer
+        self._view = memoryview(buffer)
+
+    def eof_received(self) -> bool:
+        """Close the transport when the device closes its end."""
+        return False
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Report lost connection and wake writers."""
+        self._transport = None
+        for waiter in self._drain_waiters:
+            if not waiter.done():
+                waiter.set_exception(exc or ConnectionResetError("Connection lost"))
+        if self._closing or not self._on_lost:
+            return
+        self._on_lost(exc or ConnectionResetError("Connection closed by device"))
+
+    def pause_writing(self) -> None:
+        """Transport's write buffer is full."""
+        self._paused = True
+
+    def resume_writing(self) -> None:
+        """Transport's write buffer has drained."""
+        self._paused = False
+        for waiter in self._drain_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    def write(self, data: bytes) -> None:
+        """Write data to the transport."""
+        if self._transport is None:
+            raise ConnectionResetError("Connection lost")
+        self._transport.write(data)
+
+    async def drain(self) -> None:
+        """Wait until the transport's write buffer has room.
+
+        Any number of writers may wait at once; all are woken together.
+        """
+        if self._transport is None:
+            raise ConnectionResetError("Connection lost")
+        if not self._paused:
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._drain_waiters.append(waiter)
+        try:
+            await waiter
+        finally:
+            self._drain_waiters.remove(waiter)
+
+    def pause_reading(self) -> None:
+        """Stop receiving data from the transport."""
+        if self._transport is not None:
+            self._transport.pause_reading()
+
+    def resume_reading(self) -> None:
+        """Resume receiving data from the transport."""
+        if self._transport is not None:
+            self._transport.resume_reading()
+
+    def get_extra_info(self, name: str, default: object = None) -> object:
+        """Return transport information."""
+        if self._transport is None:
+            return default
+        return self._transport.get_extra_info(name, default)
+
+    def close(self) -> None:
+        """Close the transport without reporting a lost connection."""
+        self._closing = True
+        if self._transport is not None:
+            self._transport.close()
@@ -0,0 +1,77 @@
+"""Caching hostname resolver."""
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+
+import aiodns
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class Resolver:
+    """Resolves hostnames to ip addresses, caching answers for `ttl` seconds.
+
+    Literal ip addresses are returned without a lookup. A single DNS resolver is
+    created on first use and reused afterwards.
+    """
+
+    def __init__(self, ttl: float = const.DEFAULT_DNS_TTL) -> None:
+        """Initializes resolver."""
+        self._ttl = ttl
+        self._resolver: aiodns.DNSResolver | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._cache: dict[str, tuple[float, list[str]]] = {}
+
+    async def resolve(self, host: str) -> list[str]:
+        """Return the ip addresses of host."""
+        if is_ip_address(host):
+            return [host]
+
+        cached = self._cache.get(host)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        try:
+            res = await self._get_resolver().gethostbyname(host, socket.AF_INET)
+            if len(res.addresses) < 1:
+                raise ConnectionError("Unexpected zero length addresses response")
+        except aiodns.error.DNSError as err:
+            if cached:
+                _LOGGER.warning(
+                    "Failed to resolve host %s, using last known addresses", host
+                )
+                return cached[1]
+            raise ConnectionError(f"Failed to resolve host {host}") from err
+
+        addresses = list(res.addresses)
+        self._cache[host] = (time.monotonic() + self._ttl, addresses)
+        return addresses
+
+    def invalidate(self, host: str) -> None:
+        """Expire cached addresses of host, so the next resolve looks them up."""
+        cached = self._cache.get(host)
+        if cached:
+            self._cache[host] = (0.0, cached[1])
+
+    def _get_resolver(self) -> aiodns.DNSResolver:
+        loop = asyncio.get_running_loop()
+        if self._resolver is None or self._loop is not loop:
+            self._resolver = aiodns.DNSResolver(loop=loop)
+            self._loop = loop
+        return self._resolver
+
+
+def is_ip_address(host: str) -> bool:
+    """Return if host is a literal ip address."""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
@@ -0,0 +1,100 @@
+"""Async iterator subscriptions to device events."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from . import const
+from .buffer import EventBuffer, event_key
+
+if TYPE_CHECKING:
+    from .dispatcher import Dispatcher, Signal
+
+
+class DeviceEvent(NamedTuple):
+    """Event delivered to a subscription."""
+
+    name: str
+    args: tuple[Any, ...]
+    received: float
+
+
+class EventSubscription:
+    """Async iterator over device events, buffered for a single consumer.
+
+    Events are queued without running any consumer code, so a slow consumer never
+    delays reading from the device. When `maxsize` events are waiting, `overflow`
+    either drops the oldest event or coalesces events by name, counting what it
+    discards. User defined events are never coalesced. The block policy isn't
+    supported: events arrive from a dispatcher callback, which can't wait.
+
+    Use as `async with device.events(...) as events: async for event in events:`,
+    or call `close` when done, to stop receiving events.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        names: Iterable[str] | None = None,
+        maxsize: int = const.DEFAULT_EVENT_QUEUE_SIZE,
+        overflow: str = const.OVERFLOW_DROP_OLDEST,
+    ) -> None:
+        """Initializes subscription."""
+        if overflow == const.OVERFLOW_BLOCK:
+            raise ValueError("Subscriptions can't block, use drop_oldest or coalesce")
+        self._buffer: EventBuffer[DeviceEvent | None] = EventBuffer(
+            maxsize, overflow, key=event_key
+        )
+        self._signal: Signal | None = dispatcher.connect(self._put, events=names)
+        self.lag: float = 0.0
+        self.lag_max: float = 0.0
+
+    @property
+    def depth(self) -> int:
+        """Return number of events waiting to be consumed."""
+        return len(self._buffer)
+
+    @property
+    def dropped(self) -> int:
+        """Return number of events dropped because the consumer fell behind."""
+        return self._buffer.dropped
+
+    @property
+    def coalesced(self) -> int:
+        """Return number of events replaced by a newer event of the same name."""
+        return self._buffer.coalesced
+
+    @property
+    def closed(self) -> bool:
+        """Return if the subscription no longer receives events."""
+        return self._signal is None
+
+    def close(self) -> None:
+        """Stop receiving events; iteration ends once queued events are consumed."""
+        if self._signal is None:
+            return
+        self._signal.disconnect()
+        self._signal = None
+        self._buffer.put_nowait(None)
+
+    def _put(self, name: str, *args: Any) -> None:
+        self._buffer.put_nowait(DeviceEvent(name, args, time.monotonic()))
+
+    def __aiter__(self) -> EventSubscription:
+        return self
+
+    async def __anext__(self) -> DeviceEvent:
+        event = await self._buffer.get()
+        if event is None:
+            raise StopAsyncIteration
+        self.lag = time.monotonic() - event.received
+        self.lag_max = max(self.lag_max, self.lag)
+        return event
+
+    async def __aenter__(self) -> EventSubscription:
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,173 @@
+"""Turn Kaleidescape volume events into volume actions."""
+
+import logging
+from typing import Any, Callable, ClassVar, Optional
+
+from homeassistant.components.media_player import ATTR_MEDIA_VOLUME_MUTED
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .pykaleidescape_fork.kaleidescape import const
+from .volume_feedback import VolumeFeedback
+from .volume_repeat import VolumeRepeatManager
+from .volume_target import VOLUME_DIRECTIONS, VolumeTarget
+
+_LOGGER = logging.getLogger(__name__)
+
+# Handler returning event data to fire, or None to fire nothing
+VolumeEventHandler = Callable[[str, str, float], Optional[dict[str, Any]]]
+
+
+class VolumeEventEngine:
+    """Dispatch volume events from the player through a table of handlers.
+
+    Events arrive as `NAME` or `NAME=argument`, split by the device into name
+    and argument. Each handler applies the event to the target media player
+    when there is one, and returns typed data for the bus event, e.g. the
+    decoded level of `SET_VOLUME_LEVEL=n`. The mute state is kept in a local
+    model, updated from the volume entity's state and from the engine's own
+    actions, so toggles never wait on the receiver. Events without a handler
+    are fired with their name, and their argument when there is one.
+    """
+
+    # Handler method names, by event name
+    event_handlers: ClassVar[dict[str, str]] = {
+        const.USER_DEFINED_EVENT_VOLUME_UP_PRESS: "_handle_press",
+        const.USER_DEFINED_EVENT_VOLUME_DOWN_PRESS: "_handle_press",
+        const.USER_DEFINED_EVENT_VOLUME_UP_RELEASE: "_handle_release",
+        const.USER_DEFINED_EVENT_VOLUME_DOWN_RELEASE: "_handle_release",
+        const.USER_DEFINED_EVENT_VOLUME_UP: "_handle_step",
+        const.USER_DEFINED_EVENT_VOLUME_DOWN: "_handle_step",
+        const.USER_DEFINED_EVENT_TOGGLE_MUTE: "_handle_toggle_mute",
+        const.USER_DEFINED_EVENT_SET_VOLUME_LEVEL: "_handle_set_volume_level",
+        const.USER_DEFINED_EVENT_VOLUME_QUERY: "_handle_volume_query",
+    }
+
+    def __init__(
+        self,
+        hass: Any,
+        repeat_mgr: VolumeRepeatManager,
+        event_type: str,
+        fire_events: bool = True,
+        target: Optional[VolumeTarget] = None,
+        feedback: Optional[VolumeFeedback] = None,
+        entity_id: Optional[str] = None,
+    ) -> None:
+        self._hass = hass
+        self._repeat_mgr = repeat_mgr
+        self._event_type = event_type
+        self._fire_events = fire_events
+        self._target = target
+        self._feedback = feedback
+        self.entity_id = entity_id
+        self.muted: Optional[bool] = None
+        self._unsub: Optional[Callable[[], None]] = None
+        self._handlers: dict[str, VolumeEventHandler] = {
+            name: getattr(self, method) for name, method in self.event_handlers.items()
+        }
+
+    @callback
+    def async_start(self) -> None:
+        """Follow the volume entity's state, if there is one."""
+        if self.entity_id is None or self._unsub is not None:
+            return
+        self._observe(self._hass.states.get(self.entity_id))
+        self._unsub = async_track_state_change_event(
+            self._hass, [self.entity_id], self._async_state_changed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the volume entity."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_state_changed(self, event: Any) -> None:
+        self._observe(event.data.get("new_state"))
+
+    def _observe(self, state: Any) -> None:
+        """Update the local mute state from a state of the volume entity."""
+        if state is None:
+            return
+        self.muted = state.attributes.get(ATTR_MEDIA_VOLUME_MUTED, self.muted)
+
+    @callback
+    def handle(
+        self, name: str, argument: str = "", received_at: Optional[float] = None
+    ) -> None:
+        """Handle a volume event, received at loop time `received_at`."""
+        if received_at is None:
+            received_at = self._hass.loop.time()
+        handler = self._handlers.get(name)
+        if handler is not None:
+            data = handler(name, argument, received_at)
+        else:
+            data = {"event": name}
+            if argument:
+                data["argument"] = argument
+        if data is not None and self._fire_events:
+            self._hass.bus.async_fire(self._event_type, data)
+
+    def _handle_press(
+        self, name: str, argument: str, received_at: float
+    ) -> dict[str, Any]:
+        direction = VOLUME_DIRECTIONS[name]
+        if self._target is not None:
+            self._target.step(direction)
+        self._repeat_mgr.start(name, direction, received_at)
+        # The press is step 0 of a hold; repeats continue the count
+        return {
+            "event": name,
+            "direction": direction,
+            "hold_duration": 0.0,
+            "step_index": 0,
+            "multiplier": 1,
+        }
+
+    def _handle_release(
+        self, name: str, argument: str, received_at: float
+    ) -> dict[str, Any]:
+        self._repeat_mgr.stop(name.replace("_RELEASE", "_PRESS"))
+        return {"event": name}
+
+    def _handle_step(
+        self, name: str, argument: str, received_at: float
+    ) -> dict[str, Any]:
+        direction = VOLUME_DIRECTIONS[name]
+        if self._target is not None:
+            self._target.step(direction)
+        return {"event": name, "direction": direction}
+
+    def _handle_toggle_mute(
+        self, name: str, argument: str, received_at: float
+    ) -> dict[str, Any]:
+        muted = not self.muted
+        self.muted = muted
+        if self._target is not None:
+            self._target.set_muted(muted)
+        return {"event": name, "muted": muted}
+
+    def _handle_set_volume_level(
+        self, name: str, argument: str, received_at: float
+    ) -> Optional[dict[str, Any]]:
+        try:
+            percent = int(argument)
+        except ValueError:
+            _LOGGER.warning("Ignoring %s with invalid level '%s'", name, argument)
+            return None
+        percent = min(100, max(0, percent))
+        level = percent / 100
+        if self._target is not None:
+            # An absolute level replaces any steps still waiting
+            self._target.drop_pending()
+            self._target.set_level(level)
+        return {"event": name, "level": level, "level_percent": percent}
+
+    def _handle_volume_query(
+        self, name: str, argument: str, received_at: float
+    ) -> dict[str, Any]:
+        if self._feedback is not None:
+            self._feedback.async_answer_query()
+        return {"event": name}
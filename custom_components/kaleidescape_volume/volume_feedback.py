@@ -0,0 +1,172 @@
+"""Mirror a media player's volume to the Kaleidescape on-screen display."""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from homeassistant.components.media_player import (
+    ATTR_MEDIA_VOLUME_LEVEL,
+    ATTR_MEDIA_VOLUME_MUTED,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .pykaleidescape_fork.kaleidescape import KaleidescapeError
+
+_LOGGER = logging.getLogger(__name__)
+
+FEEDBACK_MIN_INTERVAL = 0.2 # seconds between updates sent to the player
+
+
+@dataclass
+class FeedbackStats:
+    """Counters describing volume feedback sent to the player."""
+
+    updates_sent: int = 0
+    updates_suppressed: int = 0
+    updates_coalesced: int = 0
+    queries_answered: int = 0
+    send_failures: int = 0
+
+
+class VolumeFeedback:
+    """Show the volume and mute state of a media player on the Kaleidescape.
+
+    The entity's level (0-100) and mute state are cached as its state changes,
+    so `VOLUME_QUERY` is answered without asking the receiver. Values equal to
+    the last ones sent are suppressed. A single sender sends at most one update
+    at a time and one every `min_interval`, always the latest cached values, so
+    fast holds never fill the player's request window with feedback. Queries are
+    answered without waiting for `min_interval`.
+    """
+
+    def __init__(
+        self,
+        hass: Any,
+        device: Any,
+        entity_id: str,
+        capabilities: int,
+        min_interval: float = FEEDBACK_MIN_INTERVAL,
+    ) -> None:
+        self._hass = hass
+        self._device = device
+        self.entity_id = entity_id
+        self._capabilities = capabilities
+        self._min_interval = min_interval
+        self.level: Optional[int] = None
+        self.muted: Optional[bool] = None
+        self._sent_level: Optional[int] = None
+        self._sent_muted: Optional[bool] = None
+        self._send_all = False
+        self._last_sent = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._unsub: Optional[Callable[[], None]] = None
+        self.stats = FeedbackStats()
+
+    @callback
+    def async_start(self) -> None:
+        """Cache the entity's current volume and follow its changes."""
+        self._cache(self._hass.states.get(self.entity_id))
+        if self._unsub is None:
+            self._unsub = async_track_state_change_event(
+                self._hass, [self.entity_id], self._async_state_changed
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the entity and sending updates."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @callback
+    def async_answer_query(self) -> None:
+        """Answer a VOLUME_QUERY from the cached values."""
+        self.stats.queries_answered += 1
+        self.async_resend()
+
+    @callback
+    def async_resend(self) -> None:
+        """Send capabilities and every cached value, e.g. after reconnecting."""
+        self._send_all = True
+        self._wake.set()
+        self._schedule()
+
+    def _cache(self, state: Any) -> bool:
+        """Store volume of state; return if it differs from the cached one."""
+        if state is None:
+            return False
+        level = state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL)
+        level = round(level * 100) if level is not None else self.level
+        muted = state.attributes.get(ATTR_MEDIA_VOLUME_MUTED, self.muted)
+        if level == self.level and muted == self.muted:
+            return False
+        self.level = level
+        self.muted = muted
+        return True
+
+    @callback
+    def _async_state_changed(self, event: Any) -> None:
+        if not self._cache(event.data.get("new_state")):
+            self.stats.updates_suppressed += 1
+            return
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._task is not None and not self._task.done():
+            # The running sender picks up the latest values
+            self.stats.updates_coalesced += 1
+            return
+        self._task = self._hass.async_create_task(self._async_send())
+
+    def _pending(self) -> list[Callable[[], Any]]:
+        """Return sends bringing the player up to date with the cache."""
+        device = self._device
+        sends: list[Callable[[], Any]] = []
+        if self._send_all:
+            sends.append(lambda: device.set_volume_capabilities(self._capabilities))
+        level, muted = self.level, self.muted
+        if level is not None and (self._send_all or level != self._sent_level):
+            sends.append(lambda: device.set_volume_level(level))
+        if muted is not None and (self._send_all or muted != self._sent_muted):
+            sends.append(lambda: device.set_volume_muted(muted))
+        return sends
+
+    async def _async_send(self) -> None:
+        """Send updates until the player matches the cache."""
+        loop = self._hass.loop
+        while True:
+            wait = self._last_sent + self._min_interval - loop.time()
+            if wait > 0 and not self._send_all:
+                # Woken early by a query
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            level, muted = self.level, self.muted
+            sends = self._pending()
+            if not sends:
+                return
+            self._send_all = False
+            try:
+                for send in sends:
+                    await send()
+            except (KaleidescapeError, ConnectionError, asyncio.TimeoutError) as err:
+                # Sent again in full once reconnected
+                self.stats.send_failures += 1
+                _LOGGER.debug("Failed to send volume feedback: %s", err)
+                self._sent_level = self._sent_muted = None
+                return
+            finally:
+                self._last_sent = loop.time()
+
+            self.stats.updates_sent += 1
+            self._sent_level, self._sent_muted = level, muted
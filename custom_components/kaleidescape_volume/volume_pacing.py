@@ -0,0 +1,145 @@
+"""Pace volume repeats by how fast the target player applies them."""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from homeassistant.components.media_player import ATTR_MEDIA_VOLUME_LEVEL
+from homeassistant.core import callback
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.storage import Store
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 30.0 # seconds to batch interval updates before writing
+
+LATENCY_WEIGHT = 0.25 # weight of a new sample in the latency average
+PACING_HEADROOM = 1.2 # interval as a multiple of the average step-to-ack latency
+ACK_TIMEOUT_FACTOR = 4 # sends unacknowledged for this many intervals are dropped
+SAVE_THRESHOLD = 0.05 # relative interval change worth persisting
+
+
+@dataclass
+class PacingStats:
+    """Counters describing learned pacing."""
+
+    acks: int = 0
+    acks_missed: int = 0
+    latency_ewma: Optional[float] = None
+    latency_max: float = 0.0
+
+
+class AdaptivePacer:
+    """Learn the fastest repeat interval a media player keeps up with.
+
+    Every volume call is recorded by `sent`. When the entity's volume level next
+    changes, the time since the oldest unacknowledged call is a step-to-ack
+    latency sample. The interval follows an exponentially weighted average of
+    the latency with some headroom, kept between `min_interval` and
+    `max_interval`, and is persisted per entity so later sessions start from it.
+
+    Callers skip calls that can't change the level, such as at full volume.
+    Calls left unacknowledged for `ACK_TIMEOUT_FACTOR` intervals expire without
+    a sample, and `clear` forgets the outstanding ones when a hold ends, so a
+    lost ack is never matched to a later change.
+    """
+
+    def __init__(
+        self,
+        hass: Any,
+        entity_id: str,
+        store: Store,
+        stored: dict[str, float],
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+    ) -> None:
+        self._hass = hass
+        self.entity_id = entity_id
+        self._store = store
+        self._stored = stored
+        self._min_interval = min_interval
+        self._max_interval = max_interval
+        self._sent: deque[float] = deque()
+        self._unsub: Optional[Callable[[], None]] = None
+        self._saved = stored.get(entity_id)
+        self.interval = self._clamp(self._saved if self._saved else interval)
+        self.stats = PacingStats()
+
+    def _clamp(self, interval: float) -> float:
+        return min(self._max_interval, max(self._min_interval, interval))
+
+    @callback
+    def async_start(self) -> None:
+        """Start watching the entity's volume level."""
+        if self._unsub is None:
+            self._unsub = async_track_state_change_event(
+                self._hass, [self.entity_id], self._async_state_changed
+            )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop watching the entity."""
+        if self._unsub is not None:
+            self._unsub()
+            self._unsub = None
+
+    def sent(self) -> None:
+        """Record that a volume call was issued to the entity."""
+        now = self._hass.loop.time()
+        self._expire(now)
+        self._sent.append(now)
+
+    def clear(self) -> None:
+        """Forget calls not acknowledged yet."""
+        self._sent.clear()
+
+    def _expire(self, now: float) -> None:
+        """Drop calls too old to still be acknowledged."""
+        expired = now - self.interval * ACK_TIMEOUT_FACTOR
+        while self._sent and self._sent[0] < expired:
+            self._sent.popleft()
+            self.stats.acks_missed += 1
+
+    @callback
+    def _async_state_changed(self, event: Any) -> None:
+        old_state = event.data.get("old_state")
+        new_state = event.data.get("new_state")
+        if new_state is None:
+            return
+        level = new_state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL)
+        if old_state is not None and level == old_state.attributes.get(
+            ATTR_MEDIA_VOLUME_LEVEL
+        ):
+            return
+
+        now = self._hass.loop.time()
+        self._expire(now)
+        if not self._sent:
+            # Changed by something else
+            return
+        self._record(now - self._sent.popleft())
+
+    def _record(self, latency: float) -> None:
+        """Fold a latency sample into the interval."""
+        stats = self.stats
+        stats.acks += 1
+        stats.latency_max = max(stats.latency_max, latency)
+        if stats.latency_ewma is None:
+            stats.latency_ewma = latency
+        else:
+            stats.latency_ewma += LATENCY_WEIGHT * (latency - stats.latency_ewma)
+
+        self.interval = self._clamp(stats.latency_ewma * PACING_HEADROOM)
+        if (
+            self._saved is None
+            or abs(self.interval - self._saved) > self._saved * SAVE_THRESHOLD
+        ):
+            _LOGGER.debug(
+                "Learned repeat interval %.3fs for %s", self.interval, self.entity_id
+            )
+            self._saved = self.interval
+            self._stored[self.entity_id] = round(self.interval, 4)
+            self._store.async_delay_save(lambda: self._stored, STORAGE_SAVE_DELAY)
@@ -1,61 +1,252 @@
-"""Repeat HA events while a button is held."""
+"""Repeat volume steps while a button is held."""
 
 import asyncio
 import logging
-from typing import Any
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Optional
+
+if TYPE_CHECKING:
+    from .volume_pacing import AdaptivePacer
+    from .volume_target import VolumeTarget
 
 _LOGGER = logging.getLogger(__name__)
 
+REPEAT_POLICY_SKIP = "skip"  # drop steps whose deadline has passed
+REPEAT_POLICY_CATCH_UP = "catch_up"  # fire missed steps late, up to a limit
+REPEAT_POLICIES = (REPEAT_POLICY_SKIP, REPEAT_POLICY_CATCH_UP)
+MAX_CATCH_UP_STEPS = 3
+
+
+@dataclass(frozen=True)
+class RepeatProfile:
+    """How fast repeats come while a button is held.
+
+    The first repeat follows the press after `delay` (default `interval`). Over
+    the next `ramp_time` seconds the interval shortens linearly from `interval`
+    to `min_interval`, and the step multiplier reported with each repeat grows
+    from 1 to `max_multiplier`. Without `min_interval` the interval is fixed.
+    """
+
+    interval: float
+    delay: Optional[float] = None
+    min_interval: Optional[float] = None
+    ramp_time: float = 0.0
+    max_multiplier: int = 1
+
+    @property
+    def first_delay(self) -> float:
+        """Return time from the press to the first repeat."""
+        return self.interval if self.delay is None else self.delay
+
+    def _progress(self, held: float) -> float:
+        """Return how far along the ramp a hold of `held` seconds is, 0 to 1."""
+        ramped = held - self.first_delay
+        if ramped <= 0:
+            return 0.0
+        if ramped >= self.ramp_time:
+            return 1.0
+        return ramped / self.ramp_time
+
+    def interval_at(self, held: float) -> float:
+        """Return interval to the next repeat after being held `held` seconds."""
+        if self.min_interval is None or self.min_interval >= self.interval:
+            return self.interval
+        return self.interval - (self.interval - self.min_interval) * self._progress(
+            held
+        )
+
+    def multiplier_at(self, held: float) -> int:
+        """Return number of volume steps a repeat stands for after `held` seconds."""
+        if self.max_multiplier <= 1:
+            return 1
+        return 1 + round((self.max_multiplier - 1) * self._progress(held))
+
+
+@dataclass
+class RepeatStats:
+    """Achieved repeat timing, measured against the scheduled deadlines."""
+
+    steps: int = 0
+    steps_skipped: int = 0
+    callbacks: int = 0
+    interval_total: float = 0.0
+    intervals: int = 0
+    jitter_total: float = 0.0
+    jitter_max: float = 0.0
+
+    @property
+    def interval_mean(self) -> Optional[float]:
+        """Return mean time between consecutive steps of a hold."""
+        return self.interval_total / self.intervals if self.intervals else None
+
+    @property
+    def jitter_mean(self) -> Optional[float]:
+        """Return mean lateness of repeat callbacks relative to their deadline."""
+        return self.jitter_total / self.callbacks if self.callbacks else None
+
+
+class _Hold:
+    """Schedule of a single held button."""
+
+    __slots__ = (
+        "event_name",
+        "pressed_at",
+        "deadline",
+        "step_index",
+        "direction",
+        "last_fired",
+        "handle",
+    )
+
+    def __init__(
+        self, event_name: str, direction: int, pressed_at: float, deadline: float
+    ) -> None:
+        self.event_name = event_name
+        self.direction = direction
+        self.pressed_at = pressed_at
+        self.deadline = deadline
+        self.step_index = 0
+        self.last_fired: Optional[float] = None
+        self.handle: Optional[asyncio.TimerHandle] = None
+
 
 class VolumeRepeatManager:
-    """Manage repeated HA bus events while a button is held."""
+    """Manage repeated volume steps while a button is held.
+
+    Steps are scheduled on the loop at absolute deadlines following `profile`
+    from the press, so loop lag and callback time never accumulate. When the
+    loop falls a whole interval behind, `policy` either skips the missed steps
+    or fires up to `MAX_CATCH_UP_STEPS` of them at once.
+
+    Each step is applied to `target` directly when given, and fired as an HA
+    bus event when `fire_events` is set. Event data carries the hold duration,
+    the step index within the hold (the press itself being step 0) and the
+    profile's step multiplier.
+
+    With `pacer`, the interval between repeats is the one it learned from the
+    target instead of the profile's; the first delay and multiplier still apply.
+    """
 
     def __init__(
         self,
         hass: Any,
-        interval: float,
+        profile: RepeatProfile,
         event_type: str = "kaleidescape_volume_button",
+        policy: str = REPEAT_POLICY_SKIP,
+        target: Optional["VolumeTarget"] = None,
+        fire_events: bool = True,
+        pacer: Optional["AdaptivePacer"] = None,
     ) -> None:
         self._hass = hass
-        self._interval = interval
+        self._profile = profile
         self._event_type = event_type
-        self._tasks: dict[str, asyncio.Task] = {}
-
-    async def _repeat(self, event_name: str) -> None:
-        """Internal loop: fire events until cancelled."""
-        try:
-            # 🔹 Wait one interval before the *first* repeat
-            await asyncio.sleep(self._interval)
-            
-            while True:
-                _LOGGER.debug("Kaleidescape volume event: %s", event_name)
-                self._hass.bus.async_fire(self._event_type, {"event": event_name})
-                await asyncio.sleep(self._interval)
-        except asyncio.CancelledError:
-            _LOGGER.debug("Volume repeat task cancelled for %s", event_name)
-
-    def start(self, event_name: str) -> None:
-        """Start repeating the given event name."""
-        task = self._tasks.get(event_name)
-        if task is not None and not task.done():
+        self._policy = policy
+        self._target = target
+        self._fire_events = fire_events
+        self._pacer = pacer
+        self._holds: dict[str, _Hold] = {}
+        self.stats = RepeatStats()
+
+    def _fire(self, hold: _Hold) -> None:
+        """Fire steps that are due and schedule the next deadline."""
+        loop = self._hass.loop
+        profile = self._profile
+        now = loop.time()
+        lateness = now - hold.deadline
+
+        due = 1
+        deadline = hold.deadline + self._interval_at(hold.deadline - hold.pressed_at)
+        while deadline <= now:
+            due += 1
+            deadline += self._interval_at(deadline - hold.pressed_at)
+
+        steps = 1
+        if due > 1:
+            if self._policy == REPEAT_POLICY_CATCH_UP:
+                steps = min(due, MAX_CATCH_UP_STEPS)
+            self.stats.steps_skipped += due - steps
+
+        stats = self.stats
+        stats.steps += steps
+        stats.callbacks += 1
+        stats.jitter_total += lateness
+        stats.jitter_max = max(stats.jitter_max, lateness)
+        if hold.last_fired is not None:
+            stats.interval_total += now - hold.last_fired
+            stats.intervals += 1
+        hold.last_fired = now
+
+        held = now - hold.pressed_at
+        multiplier = profile.multiplier_at(held)
+        if self._target is not None:
+            self._target.step(hold.direction, steps * multiplier)
+
+        for _ in range(steps):
+            hold.step_index += 1
+            if not self._fire_events:
+                continue
+            _LOGGER.debug(
+                "Kaleidescape volume event: %s (step %s, x%s)",
+                hold.event_name,
+                hold.step_index,
+                multiplier,
+            )
+            self._hass.bus.async_fire(
+                self._event_type,
+                {
+                    "event": hold.event_name,
+                    "hold_duration": round(held, 3),
+                    "step_index": hold.step_index,
+                    "multiplier": multiplier,
+                },
+            )
+
+        hold.deadline = deadline
+        hold.handle = loop.call_at(deadline, self._fire, hold)
+
+    def _interval_at(self, held: float) -> float:
+        """Return interval to the next repeat after being held `held` seconds."""
+        if self._pacer is not None:
+            return self._pacer.interval
+        return self._profile.interval_at(held)
+
+    def start(
+        self, event_name: str, direction: int, pressed_at: Optional[float] = None
+    ) -> None:
+        """Start repeating the given event name, stepping volume in direction.
+
+        `pressed_at` is the loop time of the press; the first repeat follows it
+        by the profile's first delay.
+        """
+        if event_name in self._holds:
             return
 
-        _LOGGER.debug("Starting repeat task for %s", event_name)
-        self._tasks[event_name] = self._hass.async_create_task(
-            self._repeat(event_name)
+        _LOGGER.debug("Starting repeat for %s", event_name)
+        loop = self._hass.loop
+        if pressed_at is None:
+            pressed_at = loop.time()
+        hold = _Hold(
+            event_name, direction, pressed_at, pressed_at + self._profile.first_delay
         )
+        hold.handle = loop.call_at(hold.deadline, self._fire, hold)
+        self._holds[event_name] = hold
 
     def stop(self, event_name: str) -> None:
         """Stop repeating the given event name, if running."""
-        task = self._tasks.pop(event_name, None)
-        if task is None:
+        hold = self._holds.pop(event_name, None)
+        if hold is None:
             return
 
-        if not task.done():
-            _LOGGER.debug("Stopping repeat task for %s", event_name)
-            task.cancel()
+        _LOGGER.debug("Stopping repeat for %s", event_name)
+        if hold.handle is not None:
+            hold.handle.cancel()
+        if self._target is not None:
+            self._target.drop_pending()
+        if self._pacer is not None:
+            # Acks of a finished hold must not be matched to the next one
+            self._pacer.clear()
 
     def stop_all(self) -> None:
-        """Stop all active repeat tasks."""
-        for name in list(self._tasks.keys()):
+        """Stop all active repeats."""
+        for name in list(self._holds.keys()):
             self.stop(name)
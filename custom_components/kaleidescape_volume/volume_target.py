@@ -0,0 +1,174 @@
+"""Change a media player's volume directly through its services."""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Optional
+
+from homeassistant.components.media_player import (
+    ATTR_MEDIA_VOLUME_LEVEL,
+    ATTR_MEDIA_VOLUME_MUTED,
+    DOMAIN as MEDIA_PLAYER_DOMAIN,
+)
+from homeassistant.const import (
+    ATTR_ENTITY_ID,
+    SERVICE_VOLUME_DOWN,
+    SERVICE_VOLUME_MUTE,
+    SERVICE_VOLUME_SET,
+    SERVICE_VOLUME_UP,
+)
+from homeassistant.util import dt as dt_util
+
+if TYPE_CHECKING:
+    from .volume_pacing import AdaptivePacer
+
+_LOGGER = logging.getLogger(__name__)
+
+# Direction each button event moves the volume
+VOLUME_DIRECTIONS = {
+    "VOLUME_UP": 1,
+    "VOLUME_UP_PRESS": 1,
+    "VOLUME_DOWN": -1,
+    "VOLUME_DOWN_PRESS": -1,
+}
+
+
+@dataclass
+class VolumeTargetStats:
+    """Counters describing volume service calls."""
+
+    calls: int = 0
+    calls_failed: int = 0
+    steps_coalesced: int = 0
+    steps_dropped: int = 0
+
+
+class VolumeTarget:
+    """Step the volume of a media player entity.
+
+    Without `step`, each step is a `volume_up`/`volume_down` call. With `step`,
+    steps become one `volume_set` relative to the current level, which is the
+    last level set here while calls are outstanding or until the entity's state
+    has caught up with it.
+
+    With `coalesce`, at most one call is outstanding. Steps arriving meanwhile
+    are counted and flushed together when it returns: as one `volume_set` with
+    `step`, otherwise as further calls one at a time. `drop_pending` discards
+    steps not yet sent. Volume calls are reported to `pacer` when given.
+    """
+
+    def __init__(
+        self,
+        hass: Any,
+        entity_id: str,
+        step: Optional[float] = None,
+        coalesce: bool = False,
+        pacer: Optional["AdaptivePacer"] = None,
+    ) -> None:
+        self._hass = hass
+        self.entity_id = entity_id
+        self._step = step
+        self._coalesce = coalesce
+        self._pacer = pacer
+        self._last_set: Optional[float] = None
+        self._last_set_at: Optional[datetime] = None
+        self._in_flight = 0
+        self._pending = 0
+        self.stats = VolumeTargetStats()
+
+    def current_level(self) -> Optional[float]:
+        """Return volume level of the entity, counting levels not yet reported."""
+        state = self._hass.states.get(self.entity_id)
+        if self._last_set is not None and (
+            # A state reported while calls are outstanding may predate the last
+            self._in_flight
+            or state is None
+            or (
+                self._last_set_at is not None
+                and state.last_updated < self._last_set_at
+            )
+        ):
+            return self._last_set
+        if state is None:
+            return None
+        return state.attributes.get(ATTR_MEDIA_VOLUME_LEVEL)
+
+    def step(self, direction: int, count: int = 1) -> None:
+        """Move the volume `count` steps up (direction > 0) or down."""
+        if self._coalesce and self._in_flight:
+            self._pending += direction * count
+            self.stats.steps_coalesced += count
+            return
+        self._apply(direction * count)
+
+    def drop_pending(self) -> None:
+        """Discard coalesced steps not yet sent."""
+        if self._pending:
+            _LOGGER.debug("Dropping %s pending volume steps", self._pending)
+            self.stats.steps_dropped += abs(self._pending)
+            self._pending = 0
+
+    def _apply(self, steps: int) -> None:
+        """Send signed number of steps to the entity."""
+        level = self.current_level() if self._step is not None else None
+        if level is not None:
+            self.set_level(level + steps * self._step)
+            return
+
+        direction = 1 if steps > 0 else -1
+        service = SERVICE_VOLUME_UP if direction > 0 else SERVICE_VOLUME_DOWN
+        if self._coalesce:
+            # Relative calls can't be merged; send the rest one at a time
+            self._pending += steps - direction
+            self._call(service, {})
+            return
+        for _ in range(abs(steps)):
+            self._call(service, {})
+
+    def set_level(self, level: float) -> None:
+        """Set the volume to level, clamped to 0..1."""
+        level = round(min(1.0, max(0.0, level)), 4)
+        # Setting the current level won't change the state, so can't be paced
+        paced = level != self.current_level()
+        self._last_set = level
+        self._last_set_at = dt_util.utcnow()
+        self._call(SERVICE_VOLUME_SET, {ATTR_MEDIA_VOLUME_LEVEL: level}, paced=paced)
+
+    def set_muted(self, muted: bool) -> None:
+        """Mute or unmute the entity."""
+        # Mute doesn't change the level, so it can't be paced by its ack
+        self._call(SERVICE_VOLUME_MUTE, {ATTR_MEDIA_VOLUME_MUTED: muted}, paced=False)
+
+    def _call(self, service: str, data: dict[str, Any], paced: bool = True) -> None:
+        """Call a media player service on the entity without waiting for it."""
+        self._in_flight += 1
+        self.stats.calls += 1
+        if paced and self._pacer is not None:
+            self._pacer.sent()
+        self._hass.async_create_task(self._async_call(service, data))
+
+    async def _async_call(self, service: str, data: dict[str, Any]) -> None:
+        _LOGGER.debug(
+            "Calling %s.%s on %s %s", MEDIA_PLAYER_DOMAIN, service, self.entity_id, data
+        )
+        try:
+            await self._hass.services.async_call(
+                MEDIA_PLAYER_DOMAIN,
+                service,
+                {ATTR_ENTITY_ID: self.entity_id, **data},
+                blocking=True,
+            )
+        except Exception:  # noqa: BLE001
+            self.stats.calls_failed += 1
+            _LOGGER.exception(
+                "Failed to call %s.%s on %s",
+                MEDIA_PLAYER_DOMAIN,
+                service,
+                self.entity_id,
+            )
+        finally:
+            self._in_flight -= 1
+
+        if self._coalesce and not self._in_flight and self._pending:
+            steps, self._pending = self._pending, 0
+            self._apply(steps)
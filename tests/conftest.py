@@ -0,0 +1,11 @@
+"""Shared test setup."""
+
+import sys
+from pathlib import Path
+
+INTEGRATION = Path(__file__).parent.parent / "custom_components" / "kaleidescape_volume"
+
+# Import the vendored library, and the integration modules that don't need Home
+# Assistant, directly
+sys.path.insert(0, str(INTEGRATION / "pykaleidescape_fork"))
+sys.path.insert(0, str(INTEGRATION))
@@ -0,0 +1,126 @@
+"""Stand-in Kaleidescape device serving canned replies over a local socket."""
+
+import asyncio
+import random
+
+REPLIES = {
+    "GET_DEVICE_INFO": ["DEVICE_INFO:07:000000000123:01:192.168.001.010:"],
+    "GET_SYSTEM_VERSION": ["SYSTEM_VERSION:16:10.4.2-19218:"],
+    "GET_DEVICE_TYPE_NAME": ["DEVICE_TYPE_NAME:Strato S:"],
+    "GET_NUM_ZONES": ["NUM_ZONES:01:00:"],
+    "GET_DEVICE_POWER_STATE": ["DEVICE_POWER_STATE:1:1:"],
+    "GET_SYSTEM_READINESS_STATE": ["SYSTEM_READINESS_STATE:0:"],
+    "GET_FRIENDLY_NAME": ["FRIENDLY_NAME:Theater:"],
+    "GET_UI_STATE": ["UI_STATE:07:0:0:0:"],
+    "GET_HIGHLIGHTED_SELECTION": ["HIGHLIGHTED_SELECTION:26-0.0-S_c4ed3bb0:"],
+    "GET_PLAY_STATUS": ["PLAY_STATUS:2:0:01:07248:00311:007:00630:00061:"],
+    "GET_MOVIE_LOCATION": ["MOVIE_LOCATION:03:"],
+    "GET_SCREEN_MASK": ["SCREEN_MASK:05:000:000:05:-180:+180:"],
+    "GET_SCREEN_MASK2": ["SCREEN_MASK2:-180:+180:0:0:"],
+    "GET_CINEMASCAPE_MODE": ["CINEMASCAPE_MODE:0:"],
+    "GET_CINEMASCAPE_MASK": ["CINEMASCAPE_MASK:0:"],
+}
+
+
+def content_details(rows: int) -> list[str]:
+    """Return a content details reply with the overview and the given rows."""
+    lines = [f"CONTENT_DETAILS_OVERVIEW:{rows}:26-0.0-S_c4ed3bb0:movies:"]
+    lines.append("CONTENT_DETAILS:1:Title:Some Movie:")
+    for row in range(2, rows + 1):
+        lines.append(
+            f"CONTENT_DETAILS:{row}:Synopsis{row}:"
+            rf"Part {row}\: a story\/told\\in\nseveral lines:"
+        )
+    return lines
+
+
+def encode(body: str) -> bytes:
+    """Return a framed line; the checksum isn't verified by the library."""
+    return f"{body}/00\n".encode("latin-1")
+
+
+class FakeDevice:
+    """Device answering requests, optionally dropping a share of reply lines or
+    pausing `row_delay` seconds between them. While `silent`, requests are read
+    but never answered, as with a hung device or a dead link."""
+
+    def __init__(
+        self, drop: float = 0.0, rows: int = 40, row_delay: float = 0.0, seed: int = 1
+    ):
+        self.drop = drop
+        self.rows = rows
+        self.row_delay = row_delay
+        self.silent = False
+        self.lines_dropped = 0
+        self.connections = 0
+        self._random = random.Random(seed)
+        self._writers: list[asyncio.StreamWriter] = []
+        self._clients: set[asyncio.Task] = set()
+        self._server: asyncio.AbstractServer | None = None
+
+    @property
+    def port(self) -> int:
+        assert self._server is not None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self, port: int = 0) -> int:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", port)
+        return self.port
+
+    async def stop(self, drop_clients: bool = True) -> None:
+        """Stop listening and, unless told otherwise, close every client
+        connection."""
+        server, self._server = self._server, None
+        if server is not None:
+            server.close()
+        if not drop_clients:
+            return
+        self.drop_clients()
+        await asyncio.gather(*self._clients)
+        if server is not None:
+            await server.wait_closed()
+
+    def drop_clients(self) -> None:
+        """Close every client connection, as a device reboot would."""
+        for writer in self._writers:
+            writer.close()
+        self._writers.clear()
+
+    def event(self, body: str) -> None:
+        """Send an unsolicited event to every client."""
+        for writer in self._writers:
+            writer.write(encode(f"01/!/000:{body}"))
+
+    def reply(self, name: str) -> list[str]:
+        if name == "GET_CONTENT_DETAILS":
+            return content_details(self.rows)
+        return REPLIES.get(name, [""])
+
+    async def _serve(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        client = asyncio.current_task()
+        assert client is not None
+        self._clients.add(client)
+        self._writers.append(writer)
+        try:
+            while True:
+                request = (await reader.readuntil()).decode("latin-1").strip()
+                if self.silent:
+                    continue
+                _, seq, body = request.split("/", 2)
+                for line in self.reply(body.split(":", 1)[0]):
+                    if self.drop and self._random.random() < self.drop:
+                        self.lines_dropped += 1
+                        continue
+                    writer.write(encode(f"01/{seq}/000:{line}"))
+                    if self.row_delay:
+                        await writer.drain()
+                        await asyncio.sleep(self.row_delay)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            self._clients.discard(client)
@@ -0,0 +1,243 @@
+"""Opt-in benchmarks.
+
+Run with `KALEIDESCAPE_BENCHMARK=1 pytest -s tests/test_benchmark.py`.
+"""
+
+import asyncio
+import os
+import statistics
+import time
+import timeit
+import tracemalloc
+
+import pytest
+from fake_device import FakeDevice
+
+from kaleidescape import Device, const
+from kaleidescape.connection import Connection
+from kaleidescape.dispatcher import Dispatcher
+from kaleidescape.message import GetContentDetails, MessageParser, Request, Response
+from kaleidescape.protocol import LineProtocol
+from volume_repeat import RepeatProfile, VolumeRepeatManager
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("KALEIDESCAPE_BENCHMARK"), reason="benchmarks are opt-in"
+)
+
+LAG_TICK = 0.001
+
+PARSER_LINES = {
+    "short event": "01/!/000:USER_DEFINED_EVENT:VOLUME_UP_PRESS:/85",
+    "play status": "01/!/000:PLAY_STATUS:2:0:01:07248:00311:007:00630:00061:/79",
+    "escaped synopsis": (
+        r"01/3/000:CONTENT_DETAILS:12:Synopsis:"
+        + r"A farm boy\: Luke \/ a princess\/a droid \\ \d233t\d233\nand more. " * 8
+        + ":/92"
+    ),
+}
+
+
+async def _probe_lag(lags: list[float]) -> None:
+    """Record how late each short sleep wakes up, until cancelled."""
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(LAG_TICK)
+        lags.append(loop.time() - start - LAG_TICK)
+
+
+def _per_call(function, *args, **kwargs) -> float:
+    """Return the best time of a call in seconds, over several timing runs."""
+    timer = timeit.Timer(lambda: function(*args, **kwargs))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number
+
+
+def _report(name: str, **values: float) -> None:
+    results = ", ".join(f"{key}={value:.3f}" for key, value in values.items())
+    print(f"\n{name}: {results}")
+
+
+@pytest.mark.parametrize("kind", list(PARSER_LINES))
+def test_parser(kind):
+    """Time parsing each kind of line, eagerly and with fields left for later."""
+    line = PARSER_LINES[kind]
+    assert MessageParser(line).fields
+    _report(
+        f"parse {kind}, {len(line)} chars",
+        parser_us=_per_call(MessageParser, line) * 1e6,
+        factory_us=_per_call(Response.factory, line) * 1e6,
+        factory_lazy_us=_per_call(Response.factory, line, True) * 1e6,
+    )
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_parsed_event_memory(lazy):
+    """Measure memory allocated for 10k parsed events.
+
+    Reports what the 10k events hold while kept, and the peak while each event
+    is discarded as soon as it is parsed, i.e. the transient garbage of a parse.
+    """
+    events = 10_000
+    lines = [
+        PARSER_LINES["short event"],
+        PARSER_LINES["play status"],
+        "01/!/000:UI_STATE:07:0:0:0:/17",
+        "01/!/000:HIGHLIGHTED_SELECTION:26-0.0-S_c4ed3bb0:/60",
+    ]
+    # Distinct strings, as read from the socket
+    received = [
+        lines[index % len(lines)].replace(":/", f":{index}:/", 1)
+        for index in range(events)
+    ]
+
+    tracemalloc.start()
+    try:
+        kept = [Response.factory(line, lazy) for line in received]
+        retained, _ = tracemalloc.get_traced_memory()
+        del kept
+
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        for line in received:
+            Response.factory(line, lazy)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    _report(
+        f"10k parsed events, lazy={lazy}",
+        retained_kib=retained / 1024,
+        retained_per_event_b=retained / events,
+        transient_peak_kib=(peak - base) / 1024,
+    )
+
+
+@pytest.mark.parametrize("collector", ["event", "polling"])
+def test_content_details_loop_lag_and_cpu(collector, monkeypatch):
+    """Fetch a 40-row content details reply trickled out by a local device.
+
+    Rows arrive 5 ms apart, so the request spends most of its time waiting. CPU
+    used while waiting must stay a small share of the wall time, and other tasks
+    on the loop must keep running on time. The polling collector spins the loop
+    until every row is in, as requests used to, for comparison.
+    """
+    if collector == "polling":
+        collect = Request._collect
+
+        async def polling_collect(self, connection, response):
+            while response.multiline and not self.done:
+                await asyncio.sleep(0)
+            return await collect(self, connection, response)
+
+        monkeypatch.setattr(Request, "_collect", polling_collect)
+
+    async def run():
+        device = FakeDevice(rows=40, row_delay=0.005)
+        await device.start()
+        conn = Connection(Dispatcher())
+        await conn.connect("127.0.0.1", device.port, timeout=5)
+
+        lags: list[float] = []
+        probe = asyncio.create_task(_probe_lag(lags))
+        requests = 10
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        for _ in range(requests):
+            responses = await GetContentDetails().send(conn)
+            assert len(responses) == 41
+        wall = time.perf_counter() - wall
+        cpu = time.process_time() - cpu
+        probe.cancel()
+
+        await conn.disconnect()
+        await device.stop()
+        return wall, cpu, lags
+
+    wall, cpu, lags = asyncio.run(run())
+    _report(
+        f"content details, 40 rows, {collector} collector",
+        wall_ms=wall * 1000,
+        cpu_ms=cpu * 1000,
+        cpu_share=cpu / wall,
+        lag_mean_ms=statistics.fmean(lags) * 1000,
+        lag_max_ms=max(lags) * 1000,
+    )
+    if collector == "event":
+        # A collector polling the loop uses a whole core for the full wall time
+        assert cpu / wall < 0.5
+
+
+class _Bus:
+    """Stand-in for `hass.bus`, recording when each event is fired."""
+
+    def __init__(self):
+        self.fired: list[float] = []
+
+    def async_fire(self, event_type, data):
+        self.fired.append(time.perf_counter())
+
+
+class _Hass:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.bus = _Bus()
+
+
+def test_press_line_to_bus_latency():
+    """Time a volume press from its line entering the protocol to `async_fire`.
+
+    The press takes the user event fast lane to a handler doing what the
+    integration does for a press: start the repeat, then fire the bus event.
+    """
+    directions = {"VOLUME_UP_PRESS": 1, "VOLUME_DOWN_PRESS": -1}
+    presses = 10_000
+
+    async def run():
+        fake = FakeDevice()
+        await fake.start()
+        device = Device("127.0.0.1", port=fake.port, buffered_protocol=True)
+        await device.connect()
+        protocol = device.connection._writer
+        assert isinstance(protocol, LineProtocol)
+
+        hass = _Hass()
+        repeat_mgr = VolumeRepeatManager(hass, RepeatProfile(0.25), fire_events=False)
+
+        def handle(event, params):
+            name = params[0]
+            direction = directions.get(name)
+            if direction is not None:
+                repeat_mgr.start(name, direction, hass.loop.time())
+            else:
+                repeat_mgr.stop(name.replace("RELEASE", "PRESS"))
+            hass.bus.async_fire("kaleidescape_volume_button", {"event": name})
+
+        device.user_event_dispatcher.connect(handle, events=[const.USER_DEFINED_EVENT])
+        lines = [
+            f"01/!/000:USER_DEFINED_EVENT:{name}:/00\n".encode("latin-1")
+            for name in ("VOLUME_UP_PRESS", "VOLUME_UP_RELEASE")
+        ]
+        received = []
+        for index in range(presses):
+            line = lines[index % 2]
+            buffer = protocol.get_buffer(len(line))
+            received.append(time.perf_counter())
+            buffer[: len(line)] = line
+            protocol.buffer_updated(len(line))
+            # Let the full parse and state mirroring catch up between presses
+            await asyncio.sleep(0)
+
+        await device.disconnect()
+        await fake.stop()
+        return [fired - start for start, fired in zip(received, hass.bus.fired)]
+
+    latencies = asyncio.run(run())
+    assert len(latencies) == presses
+    latencies.sort()
+    _report(
+        "press line to bus",
+        median_us=statistics.median(latencies) * 1e6,
+        p99_us=latencies[int(presses * 0.99)] * 1e6,
+        max_us=latencies[-1] * 1e6,
+    )
@@ -0,0 +1,350 @@
+"""Tests for request sequence handling in Connection."""
+
+import asyncio
+import time
+
+import pytest
+from fake_device import FakeDevice
+
+from kaleidescape import connection as connection_module, const
+from kaleidescape.buffer import BLOCK_LIMIT_FACTOR
+from kaleidescape.connection import (
+    MAX_PENDING_REQUESTS,
+    Connection,
+    ConnectionStats,
+    LivenessOptions,
+    SequencePool,
+    reconnect_backoff,
+)
+from kaleidescape.dispatcher import Dispatcher
+from kaleidescape.error import KaleidescapeError
+from kaleidescape.message import GetContentDetails, GetDevicePowerState
+
+
+async def _abandon(conn: Connection, request) -> int:
+    """Send request without writing it, then give up before any reply."""
+    request.seq = await conn._sequences.acquire(1)
+    conn._pending_requests[request.seq] = request
+    conn.clear(request)
+    return request.seq
+
+
+def test_late_reply_frees_tombstoned_sequence():
+    async def run():
+        conn = Connection(Dispatcher())
+        seq = await _abandon(conn, GetDevicePowerState())
+        assert conn._sequences.available == MAX_PENDING_REQUESTS - 1
+        assert conn.stats.requests_reclaimed == 1
+
+        conn._handle_line(f"01/{seq}/000:DEVICE_POWER_STATE:1:1:/89")
+        assert conn.stats.late_responses_dropped == 1
+        assert conn._sequences.available == MAX_PENDING_REQUESTS
+        assert not conn._tombstones
+
+    asyncio.run(run())
+
+
+def test_late_multiline_reply_frees_sequence_after_last_row():
+    async def run():
+        conn = Connection(Dispatcher())
+        seq = await _abandon(conn, GetContentDetails())
+
+        conn._handle_line(
+            f"01/{seq}/000:CONTENT_DETAILS_OVERVIEW:2:26-0.0-S_c4ed3bb0:movies:/00"
+        )
+        conn._handle_line(f"01/{seq}/000:CONTENT_DETAILS:1:Title:Movie:/00")
+        assert conn._sequences.available == MAX_PENDING_REQUESTS - 1
+
+        conn._handle_line(f"01/{seq}/000:CONTENT_DETAILS:2:Year:1999:/00")
+        assert conn.stats.late_responses_dropped == 3
+        assert conn._sequences.available == MAX_PENDING_REQUESTS
+
+    asyncio.run(run())
+
+
+def test_missing_reply_frees_sequence_after_window(monkeypatch):
+    monkeypatch.setattr(connection_module, "TOMBSTONE_WINDOW", 0.01)
+
+    async def run():
+        conn = Connection(Dispatcher())
+        seq = await _abandon(conn, GetDevicePowerState())
+        assert seq in conn._tombstones
+
+        await asyncio.sleep(0.05)
+        assert conn._sequences.available == MAX_PENDING_REQUESTS
+        assert not conn._tombstones
+
+    asyncio.run(run())
+
+
+def test_completed_request_frees_sequence_at_once():
+    async def run():
+        conn = Connection(Dispatcher())
+        request = GetDevicePowerState()
+        request.seq = await conn._sequences.acquire(1)
+        conn._pending_requests[request.seq] = request
+
+        conn._handle_line(f"01/{request.seq}/000:DEVICE_POWER_STATE:1:1:/89")
+        assert request.done
+        conn.clear(request)
+        assert conn._sequences.available == MAX_PENDING_REQUESTS
+        assert conn.stats.requests_reclaimed == 0
+
+    asyncio.run(run())
+
+
+def test_pool_hands_out_sequences_in_order():
+    async def run():
+        pool = SequencePool(ConnectionStats(), size=3)
+        assert [await pool.acquire(1) for _ in range(3)] == [0, 1, 2]
+        assert pool.available == 0
+
+        pool.release(1)
+        pool.release(0)
+        assert [await pool.acquire(1), await pool.acquire(1)] == [1, 0]
+
+    asyncio.run(run())
+
+
+def test_pool_hands_released_sequence_to_oldest_waiter():
+    async def run():
+        stats = ConnectionStats()
+        pool = SequencePool(stats, size=1)
+        await pool.acquire(1)
+        first = asyncio.ensure_future(pool.acquire(1))
+        second = asyncio.ensure_future(pool.acquire(1))
+        await asyncio.sleep(0)
+        assert stats.slot_queue_depth == 2
+
+        pool.release(0)
+        assert await first == 0
+        assert not second.done()
+        pool.release(0)
+        assert await second == 0
+        assert pool.available == 0
+        assert stats.slot_queue_depth_max == 2
+
+    asyncio.run(run())
+
+
+def test_pool_times_out_waiting():
+    async def run():
+        pool = SequencePool(ConnectionStats(), size=1)
+        await pool.acquire(1)
+        with pytest.raises(ConnectionError):
+            await pool.acquire(0.01)
+
+        pool.release(0)
+        assert pool.available == 1
+
+    asyncio.run(run())
+
+
+def test_pool_skips_cancelled_waiter():
+    async def run():
+        pool = SequencePool(ConnectionStats(), size=1)
+        await pool.acquire(1)
+        cancelled = asyncio.ensure_future(pool.acquire(1))
+        waiting = asyncio.ensure_future(pool.acquire(1))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        pool.release(0)
+        assert await waiting == 0
+        pool.release(0)
+        assert pool.available == 1
+
+    asyncio.run(run())
+
+
+def test_pool_reset_fails_waiters():
+    async def run():
+        pool = SequencePool(ConnectionStats(), size=2)
+        await pool.acquire(1)
+        await pool.acquire(1)
+        waiter = asyncio.ensure_future(pool.acquire(1))
+        await asyncio.sleep(0)
+
+        pool.reset()
+        with pytest.raises(ConnectionError):
+            await waiter
+        assert pool.available == 2
+
+    asyncio.run(run())
+
+
+def test_stats_follow_event_queue():
+    async def on_event(response):
+        pass
+
+    async def run():
+        conn = Connection(
+            Dispatcher(),
+            on_event=on_event,
+            event_queue_size=1,
+            event_overflow=const.OVERFLOW_DROP_OLDEST,
+        )
+        stats = conn.stats
+        conn._handle_line("01/!/000:DEVICE_POWER_STATE:1:1:/89")
+        assert stats.event_queue_depth == 1
+
+        conn._handle_line("01/!/000:DEVICE_POWER_STATE:0:0:/87")
+        assert stats.event_queue_depth == 1
+        assert stats.event_queue_depth_max == 1
+        assert stats.events_dropped == 1
+
+    asyncio.run(run())
+
+
+def test_reconnect_backoff_grows_to_ceiling():
+    for attempt, ceiling in ((1, 1.0), (2, 2.0), (3, 4.0), (10, 5.0), (100, 5.0)):
+        for _ in range(20):
+            assert 0.5 <= reconnect_backoff(attempt, 0.5, 5.0) <= ceiling
+
+
+def test_pool_keeps_sequence_handed_over_as_wait_times_out():
+    async def run():
+        pool = SequencePool(ConnectionStats(), size=1)
+        seq = await pool.acquire(1)
+        loop = asyncio.get_running_loop()
+        waiter = asyncio.ensure_future(pool.acquire(0.05))
+        await asyncio.sleep(0)
+
+        # Released just before the deadline, but the loop lags past both
+        loop.call_later(0.049, pool.release, seq)
+        time.sleep(0.06)
+        try:
+            held = [await waiter]
+        except ConnectionError:
+            held = []
+        assert pool.available + len(held) == 1
+
+    asyncio.run(run())
+
+
+def test_blocked_event_queue_is_capped_while_requests_are_pending():
+    async def on_event(response):
+        pass
+
+    async def run():
+        conn = Connection(Dispatcher(), on_event=on_event, event_queue_size=4)
+        request = GetDevicePowerState()
+        request.seq = await conn._sequences.acquire(1)
+        conn._pending_requests[request.seq] = request
+
+        for position in range(1000):
+            conn._handle_line(f"01/!/000:PLAY_STATUS:2:0:01:07:0:0:2:{position}:/60")
+            if position % 100 == 0:
+                conn._handle_line(
+                    f"01/!/000:USER_DEFINED_EVENT:PRESS{position}:/00"
+                )
+        stats = conn.stats
+        assert not conn._reading_paused
+        assert stats.event_queue_depth <= 4 * BLOCK_LIMIT_FACTOR
+        assert stats.events_dropped + stats.events_coalesced > 900
+
+        events = []
+        while len(conn._events):
+            events.append(conn._events.get_nowait())
+        assert [event.name for event in events].count("USER_DEFINED_EVENT") == 10
+        # The latest state survives
+        assert any(event.fields[7:8] == ["999"] for event in events)
+
+    asyncio.run(run())
+
+
+def test_soak_with_dropped_replies_returns_every_sequence(monkeypatch):
+    monkeypatch.setattr(connection_module, "TOMBSTONE_WINDOW", 0.2)
+
+    async def run():
+        device = FakeDevice(drop=0.05, rows=5)
+        await device.start()
+        conn = Connection(Dispatcher())
+        await conn.connect("127.0.0.1", device.port, timeout=0.1)
+        failed = starved = 0
+
+        async def client(requests: int):
+            nonlocal failed, starved
+            for index in range(requests):
+                request = (
+                    GetContentDetails() if index % 4 == 0 else GetDevicePowerState()
+                )
+                try:
+                    await request.send(conn)
+                except KaleidescapeError:
+                    failed += 1
+                except ConnectionError:
+                    # Every sequence was tombstoned for longer than the timeout
+                    starved += 1
+
+        await asyncio.gather(*(client(30) for _ in range(MAX_PENDING_REQUESTS * 2)))
+        assert device.lines_dropped
+        assert failed
+        assert conn.stats.requests_reclaimed == failed
+
+        # Replies are never coming for the rest; wait out their tombstones
+        await asyncio.sleep(0.3)
+        assert not conn._tombstones
+        assert not conn._pending_requests
+        assert conn._sequences.available == MAX_PENDING_REQUESTS
+
+        await conn.disconnect()
+        await device.stop()
+
+    asyncio.run(run())
+
+
+def test_flapping_device_outage_counts_from_last_line():
+    flaps = 3
+    down = 0.2
+
+    async def run():
+        device = FakeDevice()
+        port = await device.start()
+        dispatcher = Dispatcher()
+        outages = []
+        dispatcher.connect(
+            lambda event, outage: outages.append(outage),
+            events=[const.STATE_RECONNECTED],
+        )
+        conn = Connection(
+            dispatcher,
+            liveness=LivenessOptions(heartbeat_interval=0.02, heartbeat_timeout=0.05),
+        )
+        await conn.connect(
+            "127.0.0.1",
+            port,
+            timeout=0.5,
+            reconnect=True,
+            reconnect_delay=0.02,
+            reconnect_delay_min=0.01,
+        )
+
+        for flap in range(flaps):
+            await asyncio.sleep(0.1)
+            # Device hangs and can't be reached, until it comes back
+            device.silent = True
+            await device.stop(drop_clients=False)
+            await asyncio.sleep(down)
+            device.silent = False
+            await device.start(port)
+            for _ in range(100):
+                if len(outages) > flap:
+                    break
+                await asyncio.sleep(0.01)
+
+        assert conn.state == const.STATE_CONNECTED
+        assert conn.stats.disconnects_detected == flaps
+        assert conn.stats.heartbeat_failures == flaps
+        assert len(outages) == flaps
+        # Measured from the last line received, so detecting the hang counts too
+        assert all(outage >= down for outage in outages)
+        assert conn.stats.last_outage_duration == outages[-1]
+        assert conn.stats.last_outage_duration > conn.stats.last_time_to_detect
+
+        await conn.disconnect()
+        await device.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,128 @@
+"""Tests for parsing messages from the device."""
+
+import pytest
+
+from kaleidescape import const
+from kaleidescape.error import MessageParseError
+from kaleidescape.message import (
+    DeviceInfo,
+    DevicePowerState,
+    MessageParser,
+    PlayStatus,
+    Response,
+    ScreenMask,
+    decode_fields,
+)
+
+MESSAGES = [
+    (
+        "01/!/000:USER_DEFINED_EVENT:VOLUME_UP_PRESS:/89",
+        ("01", 0, -1, 0, "USER_DEFINED_EVENT", ["VOLUME_UP_PRESS"], 89),
+    ),
+    (
+        "01.02/!/000:VOLUME_QUERY:/57",
+        ("01", 2, -1, 0, "VOLUME_QUERY", [], 57),
+    ),
+    (
+        "01/1/000:PLAY_STATUS:2:0:01:07:0:0:2:1:60:/60",
+        (
+            "01",
+            0,
+            1,
+            0,
+            "PLAY_STATUS",
+            ["2", "0", "01", "07", "0", "0", "2", "1", "60"],
+            60,
+        ),
+    ),
+    (
+        r"01/3/000:CONTENT_DETAILS:4:Title:Star Wars\: Episode IV \/ A New Hope \\ \d233:/92",
+        (
+            "01",
+            0,
+            3,
+            0,
+            "CONTENT_DETAILS",
+            ["4", "Title", "Star Wars: Episode IV / A New Hope \\ é"],
+            92,
+        ),
+    ),
+]
+
+MALFORMED = [
+    ("XX/1/000:PLAY_STATUS:/00", const.ERROR_INVALID_DEVICE),
+    ("01/X/000:PLAY_STATUS:/00", const.ERROR_INVALID_SEQ_NUMBER),
+    ("01/1/0A0:PLAY_STATUS:/00", const.ERROR_UNDETERMINED_ERROR),
+    ("01/1/000:PLAY_STATUS:2:0/00", const.ERROR_INVALID_PARAMETER),
+    (r"01/1/000:PLAY_STATUS:2:0\:1", const.ERROR_INVALID_PARAMETER),
+    ("01/1/000:PLAY_STATUS:2:", const.ERROR_CHECKSUM_ERROR),
+    ("01/1/000:PLAY_STATUS:2:/zz", const.ERROR_CHECKSUM_ERROR),
+]
+
+
+@pytest.mark.parametrize(("message", "expected"), MESSAGES)
+def test_parse(message, expected):
+    parser = MessageParser(message)
+    assert (
+        parser.device_id,
+        parser.zone,
+        parser.seq,
+        parser.status,
+        parser.name,
+        parser.fields,
+        parser.checksum,
+    ) == expected
+
+
+@pytest.mark.parametrize(("message", "expected"), MESSAGES)
+def test_lazy_parse(message, expected):
+    parser = MessageParser(message, lazy=True)
+    assert parser.name == expected[4]
+    assert not parser.parsed
+    assert parser.parse_fields() == expected[5]
+    assert parser.checksum == expected[6]
+
+
+@pytest.mark.parametrize(("message", "expected"), MESSAGES)
+def test_decode_fields(message, expected):
+    pos = MessageParser(message, lazy=True).fields_pos
+    assert decode_fields(message, pos) == (expected[5], expected[6])
+
+
+@pytest.mark.parametrize(("message", "code"), MALFORMED)
+def test_parse_malformed(message, code):
+    with pytest.raises(MessageParseError) as err:
+        MessageParser(message)
+    assert err.value.code == code
+
+
+def test_typed_fields():
+    status = Response.factory("01/1/000:PLAY_STATUS:2:0:01:07:0:0:2:1:60:/60")
+    assert isinstance(status, PlayStatus)
+    assert status.field_play_status == const.PLAY_STATUS_PLAYING
+    assert status.field_title_number == 1
+    assert status.field_title_length == 7
+    assert status.field_chapter_location == 1
+
+    power = Response.factory("01/1/000:DEVICE_POWER_STATE:1:1:0:/89")
+    assert isinstance(power, DevicePowerState)
+    assert power.field_power == const.DEVICE_POWER_STATE_ON
+    assert power.field_zone == [
+        const.DEVICE_ZONE_STATE_AVAILABLE,
+        const.DEVICE_ZONE_STATE_DISABLED,
+    ]
+
+    info = Response.factory("01/1/000:DEVICE_INFO::0123:00:192.168.001.010:/89")
+    assert isinstance(info, DeviceInfo)
+    assert info.field_serial_number == "000000000123"
+    assert info.field_cpdid == ""
+    assert info.field_ip == "192.168.1.10"
+
+
+def test_unknown_value_only_breaks_its_own_field():
+    mask = Response.factory("01/1/000:SCREEN_MASK:9:1:2:3:4:5:/00")
+    assert isinstance(mask, ScreenMask)
+    with pytest.raises(KeyError):
+        mask.field_image_ratio
+    assert mask.field_top_trim_rel == 1
+    assert mask.field_bottom_mask_abs == 5
@@ -0,0 +1,84 @@
+"""Tests for the buffered line protocol."""
+
+import asyncio
+
+import pytest
+
+from kaleidescape.protocol import LineProtocol
+
+
+class FakeTransport(asyncio.Transport):
+    """Transport recording writes."""
+
+    def __init__(self):
+        super().__init__()
+        self.written = []
+
+    def write(self, data):
+        self.written.append(data)
+
+
+def _receive(protocol: LineProtocol, data: bytes) -> None:
+    buffer = protocol.get_buffer(len(data))
+    buffer[: len(data)] = data
+    protocol.buffer_updated(len(data))
+
+
+def test_lines_split_across_receives():
+    lines = []
+    protocol = LineProtocol(lines.append)
+    protocol.connection_made(FakeTransport())
+
+    _receive(protocol, b"01/1/000:A:/00\r\n01/!/0")
+    _receive(protocol, b"00:B:/00\n\n")
+    assert lines == ["01/1/000:A:/00", "01/!/000:B:/00"]
+
+
+def test_resume_writing_wakes_every_drain():
+    async def run():
+        protocol = LineProtocol(lambda line: None)
+        protocol.connection_made(FakeTransport())
+        protocol.pause_writing()
+        drains = [asyncio.ensure_future(protocol.drain()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert not any(drain.done() for drain in drains)
+
+        protocol.resume_writing()
+        await asyncio.wait_for(asyncio.gather(*drains), 1)
+
+    asyncio.run(run())
+
+
+def test_connection_lost_fails_every_drain():
+    async def run():
+        protocol = LineProtocol(lambda line: None)
+        protocol.connection_made(FakeTransport())
+        protocol.pause_writing()
+        drains = [asyncio.ensure_future(protocol.drain()) for _ in range(3)]
+        await asyncio.sleep(0)
+
+        protocol.connection_lost(None)
+        for drain in drains:
+            with pytest.raises(ConnectionResetError):
+                await asyncio.wait_for(drain, 1)
+
+    asyncio.run(run())
+
+
+def test_cancelled_drain_is_forgotten():
+    async def run():
+        protocol = LineProtocol(lambda line: None)
+        protocol.connection_made(FakeTransport())
+        protocol.pause_writing()
+        cancelled = asyncio.ensure_future(protocol.drain())
+        waiting = asyncio.ensure_future(protocol.drain())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        protocol.resume_writing()
+        await asyncio.wait_for(waiting, 1)
+        assert not protocol._drain_waiters
+
+    asyncio.run(run())
@@ -0,0 +1,35 @@
+"""Tests for event subscriptions."""
+
+import asyncio
+
+import pytest
+
+from kaleidescape import const
+from kaleidescape.dispatcher import Dispatcher
+from kaleidescape.subscription import EventSubscription
+
+
+def test_block_overflow_is_rejected():
+    async def run():
+        with pytest.raises(ValueError):
+            EventSubscription(Dispatcher(), overflow=const.OVERFLOW_BLOCK)
+
+    asyncio.run(run())
+
+
+def test_slow_consumer_keeps_at_most_maxsize_events():
+    async def run():
+        dispatcher = Dispatcher()
+        async with EventSubscription(dispatcher, maxsize=4) as events:
+            for index in range(100):
+                dispatcher.send(const.USER_DEFINED_EVENT, index)
+            assert events.depth == 4
+            assert events.dropped == 96
+            assert [(await anext(events)).args for _ in range(4)] == [
+                (96,),
+                (97,),
+                (98,),
+                (99,),
+            ]
+
+    asyncio.run(run())
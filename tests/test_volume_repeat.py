@@ -0,0 +1,145 @@
+"""Virtual clock tests for repeat scheduling."""
+
+import heapq
+import itertools
+import random
+
+import pytest
+
+from volume_repeat import (
+    MAX_CATCH_UP_STEPS,
+    REPEAT_POLICY_CATCH_UP,
+    REPEAT_POLICY_SKIP,
+    RepeatProfile,
+    VolumeRepeatManager,
+)
+
+INTERVAL = 0.25
+LAG_MAX = 0.03  # ordinary loop lag
+STALL = 0.6  # occasional stall, longer than two intervals
+STALL_CHANCE = 0.01
+
+
+class VirtualHandle:
+    """Timer handle of the virtual loop."""
+
+    def __init__(self, when, callback, args):
+        self.when = when
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class VirtualLoop:
+    """Loop running timers in virtual time, each late by a random lag."""
+
+    def __init__(self, rng, stall_chance=0.0):
+        self.now = 0.0
+        self._rng = rng
+        self._stall_chance = stall_chance
+        self._timers = []
+        self._order = itertools.count()
+
+    def time(self):
+        return self.now
+
+    def call_at(self, when, callback, *args):
+        handle = VirtualHandle(when, callback, args)
+        heapq.heappush(self._timers, (when, next(self._order), handle))
+        return handle
+
+    def run_until(self, until):
+        while self._timers and self._timers[0][0] <= until:
+            when, _, handle = heapq.heappop(self._timers)
+            if handle.cancelled:
+                continue
+            lag = self._rng.uniform(0, LAG_MAX)
+            if self._rng.random() < self._stall_chance:
+                lag += STALL
+            self.now = max(self.now, when + lag)
+            handle.callback(*handle.args)
+        self.now = max(self.now, until)
+
+
+class Bus:
+    def __init__(self):
+        self.fired = []
+
+    def async_fire(self, event_type, data):
+        self.fired.append(data)
+
+
+class Hass:
+    def __init__(self, loop):
+        self.loop = loop
+        self.bus = Bus()
+
+
+class Target:
+    def __init__(self):
+        self.steps = 0
+
+    def step(self, direction, count=1):
+        self.steps += direction * count
+
+    def drop_pending(self):
+        pass
+
+
+def _hold_many(policy, stall_chance, holds=1000, seed=1):
+    rng = random.Random(seed)
+    loop = VirtualLoop(rng, stall_chance)
+    hass = Hass(loop)
+    manager = VolumeRepeatManager(
+        hass, RepeatProfile(INTERVAL), policy=policy, target=Target()
+    )
+    for _ in range(holds):
+        pressed_at = loop.now
+        manager.start("VOLUME_UP_PRESS", 1, pressed_at)
+        loop.run_until(pressed_at + rng.uniform(0.1, 3.0))
+        manager.stop("VOLUME_UP_PRESS")
+        loop.run_until(loop.now + rng.uniform(0.0, 1.0))
+    return manager.stats
+
+
+def test_holds_stay_within_jitter_bound():
+    stats = _hold_many(REPEAT_POLICY_SKIP, stall_chance=0.0)
+    assert stats.callbacks > 5000
+    # Lateness never accumulates beyond a single callback's lag
+    assert stats.jitter_max <= LAG_MAX
+    assert stats.jitter_mean == pytest.approx(LAG_MAX / 2, rel=0.1)
+    # Repeats don't drift from the configured interval
+    assert stats.interval_mean == pytest.approx(INTERVAL, abs=0.005)
+    assert stats.steps_skipped == 0
+
+
+def test_stalls_skip_missed_steps():
+    stats = _hold_many(REPEAT_POLICY_SKIP, stall_chance=STALL_CHANCE)
+    assert stats.jitter_max <= LAG_MAX + STALL
+    assert stats.steps_skipped > 0
+    assert stats.steps == stats.callbacks
+
+
+def test_stalls_catch_up_missed_steps():
+    stats = _hold_many(REPEAT_POLICY_CATCH_UP, stall_chance=STALL_CHANCE)
+    assert stats.jitter_max <= LAG_MAX + STALL
+    assert stats.callbacks < stats.steps <= stats.callbacks * MAX_CATCH_UP_STEPS
+    # Each callback counts once towards the mean, however many steps it fired
+    assert stats.jitter_mean == pytest.approx(
+        stats.jitter_total / stats.callbacks
+    )
+    assert stats.jitter_mean < LAG_MAX
+
+
+def test_step_events_follow_the_press():
+    loop = VirtualLoop(random.Random(1))
+    hass = Hass(loop)
+    manager = VolumeRepeatManager(hass, RepeatProfile(INTERVAL, max_multiplier=1))
+    manager.start("VOLUME_UP_PRESS", 1, 0.0)
+    loop.run_until(1.0)
+    manager.stop("VOLUME_UP_PRESS")
+    loop.run_until(2.0)
+    assert [event["step_index"] for event in hass.bus.fired] == [1, 2, 3, 4]